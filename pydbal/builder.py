@@ -22,12 +22,35 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
-import copy
-
 from pydbal.exception import DBALBuilderError
 
 
+def _extend_sql_part(sql_parts, sql_part_name, sql_part):
+    sql_parts[sql_part_name].extend(sql_part)
+
+
+def _append_sql_part(sql_parts, sql_part_name, sql_part):
+    sql_parts[sql_part_name].append(sql_part)
+
+
+def _add_join_sql_part(sql_parts, sql_part_name, sql_part):
+    joins = sql_parts[sql_part_name]
+    if sql_part[0] in joins:
+        joins[sql_part[0]].append(sql_part[1:])
+    else:
+        joins[sql_part[0]] = [sql_part[1:]]
+
+
+def _replace_sql_part(sql_parts, sql_part_name, sql_part):
+    sql_parts[sql_part_name] = sql_part
+
+
 class SQLBuilder:
+    __slots__ = (
+        "_connection", "_sql_parts", "_sql", "_from_clauses", "_params", "_type", "_state", "_first_result",
+        "_max_results", "_param_counter"
+    )
+
     SELECT = 0
     DELETE = 1
     UPDATE = 2
@@ -36,6 +59,32 @@ class SQLBuilder:
     STATE_DIRTY = 0
     STATE_CLEAN = 1
 
+    _SQL_PART_TYPES = {
+        "select":   list,
+        "from":     list,
+        "join":     dict,
+        "set":      list,
+        "where":    None,
+        "group_by": list,
+        "having":   None,
+        "order_by": list,
+        "values":   dict
+    }
+
+    _SQL_PART_ADDERS = {
+        "select":   _extend_sql_part,
+        "from":     _append_sql_part,
+        "join":     _add_join_sql_part,
+        "set":      _append_sql_part,
+        "where":    _replace_sql_part,
+        "group_by": _extend_sql_part,
+        "having":   _replace_sql_part,
+        "order_by": _append_sql_part,
+        "values":   _replace_sql_part
+    }
+
+    _NAMED_PLACEHOLDERS = {}
+
     def __init__(self, connection):
         self._connection = connection
         self._sql_parts = {
@@ -50,6 +99,7 @@ class SQLBuilder:
             "values":   {}
         }
         self._sql = None
+        self._from_clauses = None
         self._params = {}
         self._type = SQLBuilder.SELECT
         self._state = SQLBuilder.STATE_CLEAN
@@ -61,7 +111,22 @@ class SQLBuilder:
         return self.get_sql()
 
     def copy(self):
-        return copy.copy(self)
+        sb = SQLBuilder.__new__(SQLBuilder)
+        for name in SQLBuilder.__slots__:
+            setattr(sb, name, getattr(self, name))
+        sb._sql_parts = {
+            "select":   self._sql_parts["select"][:],
+            "from":     self._sql_parts["from"][:],
+            "join":     dict((k, v[:]) for k, v in self._sql_parts["join"].items()),
+            "set":      self._sql_parts["set"][:],
+            "where":    self._sql_parts["where"] and self._sql_parts["where"].copy(),
+            "group_by": self._sql_parts["group_by"][:],
+            "having":   self._sql_parts["having"] and self._sql_parts["having"].copy(),
+            "order_by": self._sql_parts["order_by"][:],
+            "values":   self._sql_parts["values"].copy()
+        }
+        sb._params = self._params.copy()
+        return sb
 
     def expr(self):
         return self._connection.get_expression_builder()
@@ -72,22 +137,25 @@ class SQLBuilder:
     def get_connection(self):
         return self._connection
 
-    def set_parameter(self, key, value):
+    @staticmethod
+    def _get_parameter_key(key):
         if isinstance(key, str):
-            key = key.lstrip(":")
+            return key.lstrip(":")
         elif not isinstance(key, int):
             raise ValueError("Argument 'key' must be int or string.")
-        self._params[key] = value
+        return key
+
+    def set_parameter(self, key, value):
+        self._params[SQLBuilder._get_parameter_key(key)] = value
         return self
 
     def set_parameters(self, params):
-        self._params.clear()
         if isinstance(params, dict):
-            for key, param in params.iteritems():
-                self.set_parameter(key, param)
+            self._params.clear()
+            self._params.update((SQLBuilder._get_parameter_key(key), param) for key, param in params.items())
         elif isinstance(params, (list, tuple)):
-            for i, param in enumerate(params):
-                self.set_parameter(i, param)
+            self._params.clear()
+            self._params.update(enumerate(params))
         else:
             raise ValueError("Argument 'params' must be dict, list or tuple.")
         return self
@@ -99,7 +167,8 @@ class SQLBuilder:
         return self._params
 
     def set_first_result(self, first_result):
-        self._state = SQLBuilder.STATE_DIRTY
+        if first_result != self._first_result:
+            self._state = SQLBuilder.STATE_DIRTY
         self._first_result = first_result
         return self
 
@@ -107,56 +176,75 @@ class SQLBuilder:
         return self._first_result
 
     def set_max_results(self, max_results):
-        self._state = SQLBuilder.STATE_DIRTY
+        if max_results != self._max_results:
+            self._state = SQLBuilder.STATE_DIRTY
         self._max_results = max_results
         return self
 
     def get_max_results(self):
         return self._max_results
 
+    def _set_type(self, type_):
+        if type_ != self._type:
+            self._state = SQLBuilder.STATE_DIRTY
+        self._type = type_
+
+    def _is_sql_part_unchanged(self, sql_part_name, sql_part):
+        current = self._sql_parts[sql_part_name]
+        adder = SQLBuilder._SQL_PART_ADDERS[sql_part_name]
+        if adder is _extend_sql_part:
+            return current == list(sql_part)
+        elif adder is _append_sql_part:
+            return current == [sql_part]
+        return isinstance(current, dict) and current == sql_part
+
     def _add(self, sql_part_name, sql_part, append=False):
         if not sql_part:
             return self
+        if not append and self._is_sql_part_unchanged(sql_part_name, sql_part):
+            return self
 
         self._state = SQLBuilder.STATE_DIRTY
+        if sql_part_name in ("from", "join"):
+            self._from_clauses = None
 
         if not append:
             self.reset_sql_part(sql_part_name)
 
-        if sql_part_name in ("select", "group_by"):
-            self._sql_parts[sql_part_name].extend(sql_part)
-        elif sql_part_name in ("from", "set", "order_by"):
-            self._sql_parts[sql_part_name].append(sql_part)
-        elif sql_part_name == "join":
-            if sql_part[0] in self._sql_parts["join"]:
-                self._sql_parts["join"][sql_part[0]].append(sql_part[1:])
-            else:
-                self._sql_parts["join"][sql_part[0]] = [sql_part[1:]]
-        else:
-            self._sql_parts[sql_part_name] = sql_part
+        SQLBuilder._SQL_PART_ADDERS[sql_part_name](self._sql_parts, sql_part_name, sql_part)
         return self
 
+    def _add_composite(self, sql_part_name, type_, parts):
+        expr = self._sql_parts[sql_part_name]
+        if isinstance(expr, CompositeExpression):
+            if expr.get_type() == type_:
+                self._state = SQLBuilder.STATE_DIRTY
+                expr.add_multiple(parts)
+                return self
+            parts = (expr, ) + parts
+        return self._add(sql_part_name, CompositeExpression(type_, *parts))
+
     def select(self, select, *args):
-        self._type = SQLBuilder.SELECT
+        self._set_type(SQLBuilder.SELECT)
         return self._add("select", (select, ) + args)
 
     def add_select(self, select, *args):
-        self._type = SQLBuilder.SELECT
+        self._set_type(SQLBuilder.SELECT)
         return self._add("select", (select, ) + args, True)
 
     def from_(self, table, alias=None):
         return self._add("from", (table, alias), True)
 
     def insert(self, table):
-        self._type = SQLBuilder.INSERT
+        self._set_type(SQLBuilder.INSERT)
         return self._add("from", (table, ))
 
     def update(self, table, alias=None):
-        self._type = SQLBuilder.UPDATE
+        self._set_type(SQLBuilder.UPDATE)
         return self._add("from", (table, alias))
 
     def delete(self, table, alias=None):
-        self._type = SQLBuilder.DELETE
+        self._set_type(SQLBuilder.DELETE)
         return self._add("from", (table, alias))
 
     def inner_join(self, from_alias, join, alias, *condition):
@@ -180,18 +268,10 @@ class SQLBuilder:
         return self._add("where", CompositeExpression(CompositeExpression.TYPE_AND, *(where, ) + args))
 
     def and_where(self, where, *args):
-        where = (where, ) + args
-        expr = self._sql_parts["where"]
-        if isinstance(expr, CompositeExpression):
-            where = (str(expr), ) + where
-        return self._add("where", CompositeExpression(CompositeExpression.TYPE_AND, *where))
+        return self._add_composite("where", CompositeExpression.TYPE_AND, (where, ) + args)
 
     def or_where(self, where, *args):
-        where = (where, ) + args
-        expr = self._sql_parts["where"]
-        if isinstance(expr, CompositeExpression):
-            where = (str(expr), ) + where
-        return self._add("where", CompositeExpression(CompositeExpression.TYPE_OR, *where))
+        return self._add_composite("where", CompositeExpression.TYPE_OR, (where, ) + args)
 
     def group_by(self, group_by, *args):
         return self._add("group_by", (group_by, ) + args)
@@ -200,30 +280,24 @@ class SQLBuilder:
         return self._add("group_by", (group_by, ) + args, True)
 
     def set_value(self, column, value):
+        self._state = SQLBuilder.STATE_DIRTY
         self._sql_parts["values"][column] = value
         return self
 
     def values(self, values):
         if isinstance(values, dict):
-            return self._add("values", values)
+            # copy is kept, so later changes to the caller's dict are not mistaken for unchanged values
+            return self._add("values", dict(values))
         return self
 
     def having(self, having, *args):
         return self._add("having", CompositeExpression(CompositeExpression.TYPE_AND, *(having, ) + args))
 
     def and_having(self, having, *args):
-        having = (having, ) + args
-        expr = self._sql_parts["having"]
-        if isinstance(expr, CompositeExpression):
-            having = (str(expr), ) + having
-        return self._add("having", CompositeExpression(CompositeExpression.TYPE_AND, *having))
+        return self._add_composite("having", CompositeExpression.TYPE_AND, (having, ) + args)
 
     def or_having(self, having, *args):
-        having = (having, ) + args
-        expr = self._sql_parts["having"]
-        if isinstance(expr, CompositeExpression):
-            having = (str(expr), ) + having
-        return self._add("having", CompositeExpression(CompositeExpression.TYPE_OR, *having))
+        return self._add_composite("having", CompositeExpression.TYPE_OR, (having, ) + args)
 
     def order_by(self, sort, order="ASC"):
         return self._add("order_by", sort + " " + order.upper())
@@ -239,24 +313,34 @@ class SQLBuilder:
         return self
 
     def reset_sql_part(self, sql_part_name):
-        if isinstance(self._sql_parts[sql_part_name], list):
+        type_ = SQLBuilder._SQL_PART_TYPES[sql_part_name]
+        if type_ is list:
             del self._sql_parts[sql_part_name][:]
-        elif isinstance(self._sql_parts[sql_part_name], dict):
+        elif type_ is dict:
             self._sql_parts[sql_part_name].clear()
         else:
             self._sql_parts[sql_part_name] = None
+        if sql_part_name in ("from", "join"):
+            self._from_clauses = None
         self._state = SQLBuilder.STATE_DIRTY
         return self
 
     def create_named_parameter(self, value, placeholder=None):
-        if placeholder is None:
-            placeholder = ":pyValue" + str(self._param_counter)
-            self._param_counter += 1
-        self.set_parameter(placeholder, value)
+        if placeholder is not None:
+            self.set_parameter(placeholder, value)
+            return placeholder
+
+        try:
+            placeholder = SQLBuilder._NAMED_PLACEHOLDERS[self._param_counter]
+        except KeyError:
+            placeholder = ":pyValue%d" % self._param_counter
+            SQLBuilder._NAMED_PLACEHOLDERS[self._param_counter] = placeholder
+        self._params[placeholder[1:]] = value
+        self._param_counter += 1
         return placeholder
 
     def create_positional_parameter(self, value):
-        self.set_parameter(self._param_counter, value)
+        self._params[self._param_counter] = value
         self._param_counter += 1
         return "?"
 
@@ -277,22 +361,28 @@ class SQLBuilder:
         return self._sql
 
     def _get_sql_for_select(self):
-        sql = "SELECT " + ", ".join(self._sql_parts["select"]) + " FROM "
-        sql += ", ".join(self._get_from_clauses().itervalues())
+        parts = [
+            "SELECT ", ", ".join(self._sql_parts["select"]),
+            " FROM ", ", ".join(self._get_from_clauses().values())
+        ]
         if self._sql_parts["where"] is not None:
-            sql += " WHERE " + str(self._sql_parts["where"])
+            parts.extend((" WHERE ", str(self._sql_parts["where"])))
         if self._sql_parts["group_by"]:
-            sql += " GROUP BY " + ", ".join(self._sql_parts["group_by"])
+            parts.extend((" GROUP BY ", ", ".join(self._sql_parts["group_by"])))
         if self._sql_parts["having"] is not None:
-            sql += " HAVING " + str(self._sql_parts["having"])
+            parts.extend((" HAVING ", str(self._sql_parts["having"])))
         if self._sql_parts["order_by"]:
-            sql += " ORDER BY " + ", ".join(self._sql_parts["order_by"])
+            parts.extend((" ORDER BY ", ", ".join(self._sql_parts["order_by"])))
+        sql = "".join(parts)
 
         if self._max_results is not None or self._first_result is not None:
             return self._connection.get_platform().modify_limit_sql(sql, self._max_results, self._first_result)
         return sql
 
     def _get_from_clauses(self):
+        if self._from_clauses is not None:
+            return self._from_clauses
+
         from_clauses = {}
         known_aliases = set()
         for from_ in self._sql_parts["from"]:
@@ -304,59 +394,58 @@ class SQLBuilder:
                 table_reference = from_[1]
 
             known_aliases.add(table_reference)
-            from_clauses[table_reference] = table_sql + self._get_sql_for_joins(table_reference, known_aliases)
+            parts = [table_sql]
+            self._get_sql_for_joins(table_reference, known_aliases, parts)
+            from_clauses[table_reference] = "".join(parts)
 
-        for from_alias in self._sql_parts["join"].iterkeys():
+        for from_alias in self._sql_parts["join"]:
             if from_alias not in known_aliases:
                 raise DBALBuilderError.unknown_alias(from_alias, known_aliases)
+
+        self._from_clauses = from_clauses
         return from_clauses
 
-    def _get_sql_for_joins(self, from_alias, known_aliases):
-        sql = ""
+    def _get_sql_for_joins(self, from_alias, known_aliases, parts):
         if from_alias in self._sql_parts["join"]:
-            for join in self._sql_parts["join"][from_alias]:
+            joins = self._sql_parts["join"][from_alias]
+            for join in joins:
                 if join[2] in known_aliases:
                     raise DBALBuilderError.non_unique_alias(join[2], known_aliases)
-                sql += " %s JOIN %s %s ON %s" % (
-                    join[0].upper(),
-                    join[1],
-                    join[2],
-                    str(join[3])
-                )
+                parts.append(" %s JOIN %s %s ON %s" % (join[0].upper(), join[1], join[2], join[3]))
                 known_aliases.add(join[2])
 
-            for join in self._sql_parts["join"][from_alias]:
-                sql += self._get_sql_for_joins(join[2], known_aliases)
-        return sql
+            for join in joins:
+                self._get_sql_for_joins(join[2], known_aliases, parts)
+        return parts
 
     def _get_sql_for_insert(self):
         return "INSERT INTO %s (%s) VALUES(%s)" % (
             self._sql_parts["from"][0][0],
-            ", ".join(self._sql_parts["values"].iterkeys()),
-            ", ".join(self._sql_parts["values"].itervalues())
+            ", ".join(self._sql_parts["values"].keys()),
+            ", ".join(self._sql_parts["values"].values())
         )
 
     def _get_sql_for_update(self):
-        sql = "UPDATE " + self._sql_parts["from"][0][0]
+        parts = ["UPDATE ", self._sql_parts["from"][0][0]]
         if self._sql_parts["from"][0][1] is not None:
-            sql += " " + self._sql_parts["from"][0][1]
+            parts.extend((" ", self._sql_parts["from"][0][1]))
         if self._sql_parts["set"]:
-            sql += " SET " + ", ".join(self._sql_parts["set"])
+            parts.extend((" SET ", ", ".join(self._sql_parts["set"])))
         if self._sql_parts["where"] is not None:
-            sql += " WHERE " + str(self._sql_parts["where"])
-        return sql
+            parts.extend((" WHERE ", str(self._sql_parts["where"])))
+        return "".join(parts)
 
     def _get_sql_for_delete(self):
-        sql = "DELETE FROM " + self._sql_parts["from"][0][0]
+        parts = ["DELETE FROM ", self._sql_parts["from"][0][0]]
         if self._sql_parts["from"][0][1] is not None:
-            sql += " " + self._sql_parts["from"][0][1]
+            parts.extend((" ", self._sql_parts["from"][0][1]))
         if self._sql_parts["where"] is not None:
-            sql += " WHERE " + str(self._sql_parts["where"])
-        return sql
+            parts.extend((" WHERE ", str(self._sql_parts["where"])))
+        return "".join(parts)
 
     def _prepare_params(self):
         args, kwargs = [], {}
-        for key, value in self._params.iteritems():
+        for key, value in self._params.items():
             if isinstance(key, int):
                 args.append(value)
             else:
@@ -374,6 +463,8 @@ class SQLBuilder:
 
 
 class ExpressionBuilder:
+    __slots__ = ("_connection", )
+
     EQ = "="
     NEQ = "<>"
     LT = "<"
@@ -400,7 +491,7 @@ class ExpressionBuilder:
 
     @staticmethod
     def comparison(x, operator, y):
-        return x + " " + operator + " " + y
+        return "%s %s %s" % (x, operator, y)
 
     @staticmethod
     def eq(x, y):
@@ -428,11 +519,11 @@ class ExpressionBuilder:
 
     @staticmethod
     def is_null(x):
-        return x + " " + ExpressionBuilder.IS_NULL
+        return "%s %s" % (x, ExpressionBuilder.IS_NULL)
 
     @staticmethod
     def is_not_null(x):
-        return x + " " + ExpressionBuilder.IS_NOT_NULL
+        return "%s %s" % (x, ExpressionBuilder.IS_NOT_NULL)
 
     @staticmethod
     def like(x, y):
@@ -444,45 +535,53 @@ class ExpressionBuilder:
 
     @staticmethod
     def in_(x, y):
-        return ExpressionBuilder.comparison(x, ExpressionBuilder.IN, "(" + ", ".join(y) + ")")
+        return "%s %s (%s)" % (x, ExpressionBuilder.IN, ", ".join(y))
 
     @staticmethod
     def not_in(x, y):
-        return ExpressionBuilder.comparison(x, ExpressionBuilder.NOT_IN, "(" + ", ".join(y) + ")")
+        return "%s %s (%s)" % (x, ExpressionBuilder.NOT_IN, ", ".join(y))
 
     def literal(self, value):
         return self._connection.get_driver().escape_string(value)
 
 
 class CompositeExpression:
+    __slots__ = ("_type", "_parts", "_cached_str")
+
     TYPE_AND = "AND"
     TYPE_OR = "OR"
 
+    _SEPARATORS = {
+        TYPE_AND: ") AND (",
+        TYPE_OR: ") OR ("
+    }
+
     def __init__(self, type_, *parts):
         self._type = type_
         self._parts = []
+        self._cached_str = None
         self.add_multiple(parts)
 
     def __len__(self):
         return len(self._parts)
 
     def __str__(self):
-        if len(self._parts) == 1:
-            return CompositeExpression._str(self._parts[0])
-        parts = map(CompositeExpression._str, self._parts)
-        return "(" + (") " + self._type + " (").join(parts) + ")"
+        if self._cached_str is None:
+            parts = [str(part) if isinstance(part, CompositeExpression) else part for part in self._parts]
+            if len(parts) == 1:
+                self._cached_str = parts[0]
+            else:
+                self._cached_str = "(" + CompositeExpression._SEPARATORS[self._type].join(parts) + ")"
+        return self._cached_str
 
     def __iter__(self):
         return iter(self._parts)
 
-    @staticmethod
-    def _str(part):
-        if isinstance(part, CompositeExpression):
-            return str(part)
-        return part
-
     def copy(self):
-        return copy.copy(self)
+        expr = CompositeExpression(self._type)
+        expr._parts = self._parts[:]
+        expr._cached_str = self._cached_str
+        return expr
 
     def get_type(self):
         return self._type
@@ -495,6 +594,10 @@ class CompositeExpression:
         return self
 
     def add(self, part):
-        if (isinstance(part, CompositeExpression) and len(part) > 0) or part:
+        if isinstance(part, CompositeExpression) and part._type == self._type:
+            self._parts.extend(part._parts)
+            self._cached_str = None
+        elif (isinstance(part, CompositeExpression) and len(part) > 0) or part:
             self._parts.append(part)
+            self._cached_str = None
         return self
@@ -22,30 +22,88 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
-try:
-    from pylru import lrucache
-    _cache = lrucache(128)
-except ImportError:
-    _cache = {}
+import time
+import functools
+import threading
+
+from collections import OrderedDict
+
+MAX_SIZE = 128
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by ``max_size`` entries (unbounded if ``None``)."""
+
+    def __init__(self, max_size=MAX_SIZE):
+        self._max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._data.pop(key)
+            self._data[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if self._max_size is not None and len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TTLCache(LRUCache):
+    """Thread-safe LRU cache which entries expire in ``ttl`` seconds after they are set (never if ``None``)."""
+
+    def __init__(self, max_size=MAX_SIZE, ttl=None):
+        LRUCache.__init__(self, max_size)
+        self._ttl = ttl
+
+    def __getitem__(self, key):
+        expires, value = LRUCache.__getitem__(self, key)
+        if expires is not None and expires <= time.time():
+            LRUCache.pop(self, key)
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        LRUCache.__setitem__(self, key, (None if self._ttl is None else time.time() + self._ttl, value))
+
+    def pop(self, key, default=None):
+        item = LRUCache.pop(self, key)
+        return default if item is None else item[1]
+
+
+_cache = LRUCache()
 
 
 def cached(func):
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        if len(args) < func.func_code.co_argcount:
-            args += func.func_defaults
+        if len(args) < func.__code__.co_argcount:
+            args += (func.__defaults__ or ())[len(args) - func.__code__.co_argcount:]
 
-        if not kwargs.pop("_cache", True):
+        key = func, args
+        if kwargs.pop("_cache", True):
             try:
-                del _cache[func, args]
-            finally:
-                return func(*args, **kwargs)
-
-        try:
-            return _cache[func, args]
-        except KeyError:
-            result = func(*args, **kwargs)
-            _cache[func, args] = result
-            return result
+                return _cache[key]
+            except KeyError:
+                pass
+        else:
+            _cache.pop(key)
+
+        result = func(*args, **kwargs)
+        _cache[key] = result
+        return result
     return wrapper
 
 clear = _cache.clear
@@ -22,15 +22,49 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
+import sys
+import atexit
 import logging
+import weakref
+import importlib
+
+from collections import OrderedDict
 
 from pydbal.drivers import BaseDriver
-from pydbal.statement import Statement
+from pydbal.cache import MAX_SIZE, TTLCache
+from pydbal.statement import Statement, PreparedSQL, BufferedStatement
 from pydbal.schema import SchemaManager
-from pydbal.exception import DBALConnectionError
+from pydbal.exception import DBALConnectionError, DBALDriverError
 from pydbal.builder import SQLBuilder, ExpressionBuilder
 
 
+# stateless expression builder helpers used by `insert`, `update` and `delete`
+_expr_eq = ExpressionBuilder.eq
+_expr_in = ExpressionBuilder.in_
+_expr_is_null = ExpressionBuilder.is_null
+
+# kept apart from "pydbal" logger, which `Connection.get_default_logger()` sets up to print SQL
+_null_logger = logging.getLogger("pydbal.null")
+_null_logger.addHandler(logging.NullHandler())
+_null_logger.setLevel(logging.CRITICAL + 1)
+_null_logger.propagate = False
+
+# shared by all default loggers, created on first use
+_default_handler = None
+
+try:
+    _finalize = weakref.finalize
+except AttributeError:  # Python 2
+    # weak references are kept alive until their referents are collected
+    _finalize_refs = set()
+
+    def _finalize(obj, func, *args):
+        def callback(ref):
+            _finalize_refs.discard(ref)
+            func(*args)
+        _finalize_refs.add(weakref.ref(obj, callback))
+
+
 class Connection:
     """pyDBAL generic connection class.
 
@@ -38,6 +72,15 @@ class Connection:
     package and initialise ``Connection`` class for a required driver with
     desired parameters.
     """
+    __slots__ = (
+        "_logger", "_driver", "_platform", "_schema_manager", "_expr", "_statement", "_prepared", "_dml",
+        "_max_prepared", "_auto_connect", "_auto_commit", "_fetch_mode", "_inline_scalars", "_connected",
+        "_transaction_nesting_level", "_transaction_isolation_level", "_nest_transactions_with_savepoints",
+        "_is_rollback_only", "_savepoints_supported", "_release_savepoints_supported",
+        "_driver_row_count", "_driver_last_insert_id", "_driver_error_code", "_driver_error_info", "_pool",
+        "_query_cache", "__weakref__"
+    )
+
     DRIVERS = {
         "mysql": "pydbal.drivers.mysql.MySQLDriver",
         "sqlite": "pydbal.drivers.sqlite.SQLiteDriver"
@@ -55,57 +98,101 @@ class Connection:
     TRANSACTION_REPEATABLE_READ = 3
     TRANSACTION_SERIALIZABLE = 4
 
+    _SAVEPOINT_NAMES = tuple("PYDBAL_SAVEPOINT_%d" % i for i in range(64))
+    _SCRIPT_SAVEPOINT = "PYDBAL_SCRIPT"
+
+    _SEQUENCE_BASES = (list, tuple, set, frozenset)
+    _SEQUENCE_TYPES = frozenset(_SEQUENCE_BASES)
+
     _instance_count = 0
 
-    def __init__(self, driver, auto_connect=True, auto_commit=True, fetch_mode=FETCH_DICT, logger=None, **params):
+    def __init__(self, driver, auto_connect=True, auto_commit=True, fetch_mode=FETCH_DICT, logger=None,
+                 max_prepared=256, inline_scalars=False, pool=None, **params):
         """Initialises database connection.
 
         :param driver: database driver
         :param auto_connect: set connection auto (re)connect
         :param auto_commit: set connection auto commit
         :param fetch_mode: set default fetch mode
-        :param logger: driver logger
+        :param logger: driver logger (SQL is not logged by default, use `Connection.get_default_logger()` to print it)
+        :param max_prepared: number of prepared SQL statements to cache (0 to disable)
+        :param inline_scalars: inline `None`, bool, int and float values as SQL literals in `insert`, `update` and
+            `delete` instead of binding them as parameters
+        :param pool: connection pool the connection is returned to by `release` (see `pydbal.pool.ConnectionPool`)
         :param params: database connection parameters
         """
         if not isinstance(logger, logging.Logger):
-            logger = Connection.get_default_logger()
+            logger = _null_logger
         self._logger = logger
 
-        params = dict(auto_commit=auto_commit, logger=logger, **params)
         if isinstance(driver, BaseDriver):
             self._driver = driver
         else:
-            if driver not in Connection.DRIVERS:
-                raise DBALConnectionError.unknown_driver(driver, Connection.DRIVERS.iterkeys())
-            pkg, cls = Connection.DRIVERS[driver].rsplit(".", 1)
-            module = __import__(pkg, fromlist=[cls])
-            self._driver = getattr(module, cls)(**params)
+            params["auto_commit"] = auto_commit
+            params["logger"] = logger
+            self._driver = Connection._get_driver_class(driver)(**params)
 
-        self._params = params
+        # bound once, drivers keep these methods across reconnects
+        self._driver_row_count = self._driver.row_count
+        self._driver_last_insert_id = self._driver.last_insert_id
+        self._driver_error_code = self._driver.error_code
+        self._driver_error_info = self._driver.error_info
 
         self._platform = self._driver.get_platform()
-        self._schema_manager = SchemaManager(self)
-
-        self._expr = ExpressionBuilder(self)
+        self._savepoints_supported = self._platform.is_savepoints_supported()
+        self._release_savepoints_supported = self._platform.is_release_savepoints_supported()
+        self._schema_manager = None
+
+        self._expr = None
+        self._statement = Statement(self)
+        self._prepared = OrderedDict()
+        self._dml = {}
+        self._query_cache = None
+        self._max_prepared = max_prepared
         self._auto_connect = auto_connect
         self._auto_commit = auto_commit
         self._fetch_mode = fetch_mode
+        self._inline_scalars = inline_scalars
 
+        self._connected = False
         self._transaction_nesting_level = 0
         self._transaction_isolation_level = None
         self._nest_transactions_with_savepoints = False
         self._is_rollback_only = False
+        self._pool = pool
 
         if auto_connect:
             self.connect()
 
         Connection._instance_count += 1
+        _finalize(self, _finalize_connection, self._driver)
 
-    def __del__(self):
-        """Closes connection on instance destroy."""
-        if hasattr(self, "_driver"):
-            Connection._instance_count -= 1
-            self.close()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Closes connection on exit from `with` statement."""
+        self.close()
+
+    @staticmethod
+    def _get_driver_class(driver):
+        """Resolves driver class by name, importing its module on first use only.
+
+        `Connection.DRIVERS` values are either driver classes or their import paths. Import path is replaced with the
+        resolved class, so following connections skip the import.
+
+        :param driver: driver name
+        :return: driver class
+        :raise: pydbal.exception.DBALConnectionError
+        """
+        try:
+            cls = Connection.DRIVERS[driver]
+        except KeyError:
+            raise DBALConnectionError.unknown_driver(driver, Connection.DRIVERS.keys())
+        if isinstance(cls, str):
+            module, name = cls.rsplit(".", 1)
+            cls = Connection.DRIVERS[driver] = getattr(importlib.import_module(module), name)
+        return cls
 
     @staticmethod
     def cache_clear():
@@ -121,18 +208,16 @@ class Connection:
         :return: logger instance
         :rtype: logging.Logger
         """
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG)
-        handler.setFormatter(logging.Formatter(
-            "[%(levelname)1.1s %(asctime)s %(name)s] %(message)s",
-            "%y%m%d %H:%M:%S"))
+        global _default_handler
+        if _default_handler is None:
+            _default_handler = _create_default_handler()
 
         logger_name = "pydbal"
         if Connection._instance_count > 1:
             logger_name += ":" + str(Connection._instance_count)
         logger = logging.getLogger(logger_name)
         logger.setLevel(logging.DEBUG)
-        logger.addHandler(handler)
+        logger.addHandler(_default_handler)
         return logger
 
     def get_logger(self):
@@ -143,6 +228,14 @@ class Connection:
         """
         return self._logger
 
+    def get_pool(self):
+        """Returns connection pool the connection belongs to.
+
+        :return: pool instance or `None` if connection is not pooled
+        :rtype: pydbal.pool.ConnectionPool
+        """
+        return self._pool
+
     def get_driver(self):
         """Returns the DBAL driver instance.
 
@@ -189,11 +282,23 @@ class Connection:
     def connect(self):
         """Opens database connection."""
         self._driver.connect()
+        self._connected = True
 
     def close(self):
         """Closes database connection."""
+        self._connected = False
         self._driver.close()
 
+    def release(self):
+        """Returns connection to the pool it was acquired from, or closes it if connection is not pooled.
+
+        Connection must not be used after it is released.
+        """
+        if self._pool is None:
+            self.close()
+        else:
+            self._pool.release(self)
+
     def is_connected(self):
         """Checks whether an actual connection to the database is established.
 
@@ -204,17 +309,30 @@ class Connection:
 
     def ensure_connected(self):
         """Ensures database connection is still open."""
-        if not self.is_connected():
-            if not self._auto_connect:
-                raise DBALConnectionError.connection_closed()
+        if not self._connected:
+            self._ensure_connected()
+
+    def _ensure_connected(self):
+        """Checks the driver connection when the connection is not known to be open, (re)connecting if allowed."""
+        if self.is_connected():
+            self._connected = True
+        elif not self._auto_connect:
+            raise DBALConnectionError.connection_closed()
+        else:
             self.connect()
 
+    def _check_connected(self):
+        """Refreshes connected flag from the driver, e.g. after its failed attempt to reconnect."""
+        self._connected = self._driver.is_connected()
+
     def get_schema_manager(self):
         """Gets the schema manager that can be used to inspect or change the database schema through the connection.
 
         :return: schema manager
         :rtype: pydbal.schema.SchemaManager
         """
+        if self._schema_manager is None:
+            self._schema_manager = SchemaManager(self)
         return self._schema_manager
 
     def sql_builder(self):
@@ -231,6 +349,8 @@ class Connection:
         :return: expression builder
         :rtype: pydbal.builder.ExpressionBuilder
         """
+        if self._expr is None:
+            self._expr = ExpressionBuilder(self)
         return self._expr
 
     def get_fetch_mode(self):
@@ -248,31 +368,192 @@ class Connection:
         """
         self._fetch_mode = fetch_mode
 
+    def get_max_prepared(self):
+        """Returns number of prepared SQL statements to cache.
+
+        :return: prepared SQL cache size
+        :rtype: int
+        """
+        return self._max_prepared
+
+    def set_max_prepared(self, max_prepared):
+        """Sets number of prepared SQL statements to cache, evicting the least recently used ones above the size.
+
+        :param max_prepared: prepared SQL cache size (0 to disable)
+        """
+        self._max_prepared = max_prepared
+        self._dml.clear()
+        while self._prepared and len(self._prepared) > max_prepared:
+            self._prepared.popitem(last=False)
+
     def query(self, sql, *args, **kwargs):
         """Executes an SQL SELECT query, returning a result set as a Statement object.
 
-        :param sql: query to execute
+        If query cache is enabled, results of SELECT queries outside of transactions are served from the cache, and
+        any other query clears it.
+
+        :param sql: query to execute (string or prepared SQL)
         :param args: parameters iterable
         :param kwargs: parameters iterable
         :return: result set as a Statement object
         :rtype: pydbal.statement.Statement
         """
+        key = None
+        if self._query_cache is not None:
+            if not Connection._is_select(sql):
+                # e.g. write sent through `query`, cached results could be stale after it
+                self._query_cache.clear()
+            elif self._transaction_nesting_level == 0:
+                key = self._get_query_cache_key(sql, args, kwargs)
+            if key is not None:
+                try:
+                    return BufferedStatement(self, self._query_cache[key])
+                except KeyError:
+                    pass
+
         self.ensure_connected()
-        stmt = Statement(self)
-        stmt.execute(sql, *args, **kwargs)
-        return stmt
+        try:
+            self._statement.execute(self.prepare(sql), *args, **kwargs)
+        except DBALDriverError:
+            self._check_connected()
+            raise
+
+        if key is not None:
+            rows = self._query_cache[key] = tuple(self._driver.fetchall())
+            return BufferedStatement(self, rows)
+        return self._statement
 
     def execute(self, sql, *args, **kwargs):
         """Executes an SQL INSERT/UPDATE/DELETE query with the given parameters and returns the number of affected rows.
 
-        :param sql: statement to execute
+        Query cache is cleared, if enabled.
+
+        :param sql: statement to execute (string or prepared SQL)
         :param args: parameters iterable
         :param kwargs: parameters iterable
         :return: number of affected rows
         :rtype: int
         """
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
         self.ensure_connected()
-        return Statement(self).execute(sql, *args, **kwargs)
+        try:
+            return self._statement.execute(self.prepare(sql), *args, **kwargs)
+        except DBALDriverError:
+            self._check_connected()
+            raise
+
+    def execute_many(self, sql, params):
+        """Executes an SQL INSERT/UPDATE/DELETE query once for every row of parameters in a single driver batch.
+
+        Query cache is cleared, if enabled.
+
+        :param sql: statement to execute (string or prepared SQL)
+        :param params: iterable of parameter rows (sequences for positional or dicts for named parameters)
+        :return: number of affected rows
+        :rtype: int
+        """
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
+        self.ensure_connected()
+        try:
+            return self._statement.execute_many(self.prepare(sql), params)
+        except DBALDriverError:
+            self._check_connected()
+            raise
+
+    def execute_script(self, statements):
+        """Executes SQL statements without parameters as a single script, in one round trip where the driver allows.
+
+        Inside a transaction the script runs in a savepoint, and a failing statement rolls back the whole script,
+        leaving the transaction active. Outside of a transaction statements before the failing one are kept.
+
+        Query cache is cleared, if enabled.
+
+        :param statements: iterable of SQL statements
+        """
+        statements = list(statements)
+        if not statements:
+            return
+
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
+        self.ensure_connected()
+        try:
+            if self._transaction_nesting_level > 0 and self._savepoints_supported:
+                self._platform.execute_in_savepoint(Connection._SCRIPT_SAVEPOINT, statements)
+            else:
+                self._driver.execute_script(statements)
+        except DBALDriverError:
+            self._check_connected()
+            raise
+
+    def set_query_cache(self, max_size=MAX_SIZE, ttl=None):
+        """Enables in-memory cache of SELECT query results, keyed by SQL and parameters.
+
+        Cache is cleared by `execute`, `execute_many`, `execute_script`, `insert_many` and non-SELECT `query` calls, but
+        not on changes made by other connections, so `ttl` should be set to how stale results are allowed to be.
+
+        :param max_size: maximum number of cached results (0 to disable the cache)
+        :param ttl: number of seconds results are cached for (`None` to cache until cleared or evicted)
+        """
+        self._query_cache = TTLCache(max_size, ttl) if max_size else None
+
+    @staticmethod
+    def _is_select(sql):
+        """Checks whether query is a SELECT query, so its results can be cached.
+
+        :param sql: query (string or prepared SQL)
+        :return: `True` if query starts with SELECT, `False` otherwise
+        :rtype: bool
+        """
+        return str(sql).lstrip()[:6].upper() == "SELECT"
+
+    @staticmethod
+    def _get_query_cache_key(sql, args, kwargs):
+        """Returns query cache key for the SELECT query with its parameters.
+
+        :param sql: SELECT query (string or prepared SQL)
+        :param args: positional parameters
+        :param kwargs: named parameters
+        :return: cache key or `None` if query parameters are not hashable
+        """
+        key = str(sql), args, tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:  # e.g. list parameters
+            return None
+        return key
+
+    def prepare(self, sql):
+        """Prepares SQL for repeated execution, so parameters are bound without parsing the SQL again.
+
+        Prepared SQL is cached by its text, and can be passed to `query` and `execute` in place of a string:
+
+            stmt = conn.prepare('INSERT INTO table VALUES (?, ?)')
+            for row in rows:
+                conn.execute(stmt, *row)
+
+        :param sql: SQL to prepare
+        :return: prepared SQL
+        :rtype: pydbal.statement.PreparedSQL
+        """
+        if isinstance(sql, PreparedSQL):
+            return sql
+        if self._max_prepared <= 0:
+            return Statement.prepare(sql)
+        # hit is popped and inserted again as the most recently used, OrderedDict.move_to_end() is Python 3 only
+        prepared = self._prepared.pop(sql, None)
+        if prepared is not None:
+            self._prepared[sql] = prepared
+            return prepared
+        if len(self._prepared) >= self._max_prepared:
+            self._prepared.popitem(last=False)
+        prepared = self._prepared[sql] = Statement.prepare(sql)
+        return prepared
 
     def row_count(self):
         """Returns the number of rows affected by the last DELETE, INSERT, or UPDATE statement.
@@ -285,7 +566,7 @@ class Connection:
         :rtype: int
         """
         self.ensure_connected()
-        return self._driver.row_count()
+        return self._driver_row_count()
 
     def last_insert_id(self, seq_name=None):
         """Returns the ID of the last inserted row, or the last value from a sequence object,
@@ -298,7 +579,7 @@ class Connection:
         :return: representation of the last inserted ID
         """
         self.ensure_connected()
-        return self._driver.last_insert_id(seq_name)
+        return self._driver_last_insert_id(seq_name)
 
     def error_code(self):
         """Fetches the SQLSTATE associated with the last database operation.
@@ -307,7 +588,7 @@ class Connection:
         :rtype: int
         """
         self.ensure_connected()
-        return self._driver.error_code()
+        return self._driver_error_code()
 
     def error_info(self):
         """Fetches extended error information associated with the last database operation.
@@ -315,60 +596,102 @@ class Connection:
         :return: the last error information
         """
         self.ensure_connected()
-        return self._driver.error_info()
+        return self._driver_error_info()
 
     def begin_transaction(self):
         """Starts a transaction by suspending auto-commit mode."""
         self.ensure_connected()
+        if self._transaction_nesting_level != 0:
+            return self._begin_nested_transaction()
+        self._driver.begin_transaction()
+        self._transaction_nesting_level = 1
+
+    def _begin_nested_transaction(self):
+        """Starts a nested transaction, creating a savepoint if nested transactions use savepoints."""
         self._transaction_nesting_level += 1
-        if self._transaction_nesting_level == 1:
-            self._driver.begin_transaction()
-        elif self._nest_transactions_with_savepoints:
-            self.create_savepoint(self._get_nested_transaction_savepoint_name())
+        if self._nest_transactions_with_savepoints:
+            # savepoints support is checked when nesting with savepoints is enabled
+            self._platform.create_savepoint(self._get_nested_transaction_savepoint_name())
 
     def commit(self):
         """Commits the current transaction."""
+        if self._transaction_nesting_level != 1:
+            return self._commit_nested_transaction()
+        if self._is_rollback_only:
+            raise DBALConnectionError.commit_failed_rollback_only()
+
+        self.ensure_connected()
+        self._driver.commit()
+        if self._auto_commit:
+            self._transaction_nesting_level = 0
+        else:
+            # connection is known to be open, start the next transaction right away
+            self._driver.begin_transaction()
+
+    def _commit_nested_transaction(self):
+        """Commits the current nested transaction, releasing its savepoint if nested transactions use savepoints."""
         if self._transaction_nesting_level == 0:
             raise DBALConnectionError.no_active_transaction()
         if self._is_rollback_only:
             raise DBALConnectionError.commit_failed_rollback_only()
 
         self.ensure_connected()
-        if self._transaction_nesting_level == 1:
-            self._driver.commit()
-        elif self._nest_transactions_with_savepoints:
-            self.release_savepoint(self._get_nested_transaction_savepoint_name())
-
+        if self._nest_transactions_with_savepoints and self._release_savepoints_supported:
+            self._platform.release_savepoint(self._get_nested_transaction_savepoint_name())
         self._transaction_nesting_level -= 1
 
-        if not self._auto_commit and self._transaction_nesting_level == 0:
-            self.begin_transaction()
-
     def commit_all(self):
         """Commits all current nesting transactions."""
-        while self._transaction_nesting_level != 0:
-            if not self._auto_commit and self._transaction_nesting_level == 1:
-                return self.commit()
-            self.commit()
+        if self._transaction_nesting_level == 0:
+            return
+        if self._is_rollback_only:
+            raise DBALConnectionError.commit_failed_rollback_only()
+
+        # outermost commit releases all nested savepoints as well
+        self.ensure_connected()
+        self._driver.commit()
+        self._transaction_nesting_level = 0
+
+        if not self._auto_commit:
+            self.begin_transaction()
 
     def rollback(self):
         """Cancels any database changes done during the current transaction."""
+        if self._transaction_nesting_level != 1:
+            return self._rollback_nested_transaction()
+
+        self.ensure_connected()
+        self._transaction_nesting_level = 0
+        self._driver.rollback()
+        self._is_rollback_only = False
+        if not self._auto_commit:
+            self._driver.begin_transaction()
+            self._transaction_nesting_level = 1
+
+    def rollback_all(self):
+        """Cancels all current nesting transactions."""
+        if self._transaction_nesting_level == 0:
+            return
+
+        self.ensure_connected()
+        self._transaction_nesting_level = 0
+        self._driver.rollback()
+        self._is_rollback_only = False
+        if not self._auto_commit:
+            self.begin_transaction()
+
+    def _rollback_nested_transaction(self):
+        """Cancels the current nested transaction, rolling back to its savepoint if nested transactions use savepoints
+        or marking the whole transaction for rollback only otherwise."""
         if self._transaction_nesting_level == 0:
             raise DBALConnectionError.no_active_transaction()
 
         self.ensure_connected()
-        if self._transaction_nesting_level == 1:
-            self._transaction_nesting_level = 0
-            self._driver.rollback()
-            self._is_rollback_only = False
-            if not self._auto_commit:
-                self.begin_transaction()
-        elif self._nest_transactions_with_savepoints:
-            self.rollback_savepoint(self._get_nested_transaction_savepoint_name())
-            self._transaction_nesting_level -= 1
+        if self._nest_transactions_with_savepoints:
+            self._platform.rollback_savepoint(self._get_nested_transaction_savepoint_name())
         else:
             self._is_rollback_only = True
-            self._transaction_nesting_level -= 1
+        self._transaction_nesting_level -= 1
 
     def transaction(self, callback):
         """Executes a function in a transaction.
@@ -376,7 +699,7 @@ class Connection:
         The function gets passed this Connection instance as an (optional) parameter.
 
         If an exception occurs during execution of the function or transaction commit,
-        the transaction is rolled back and the exception re-thrown.
+        the transaction is rolled back and the exception re-thrown with its original traceback.
 
         :param callback: the function to execute in a transaction
         :return: the value returned by the `callback`
@@ -387,7 +710,7 @@ class Connection:
             result = callback(self)
             self.commit()
             return result
-        except:
+        except BaseException:
             self.rollback()
             raise
 
@@ -417,7 +740,7 @@ class Connection:
 
         self._auto_commit = auto_commit
 
-        if self.is_connected() and self._transaction_nesting_level != 0:
+        if self._transaction_nesting_level != 0 and self.is_connected():
             self.commit_all()
 
     def is_transaction_active(self):
@@ -470,7 +793,7 @@ class Connection:
         """
         if self._transaction_nesting_level > 0:
             raise DBALConnectionError.may_not_alter_nested_transaction_with_savepoints_in_transaction()
-        if not self._platform.is_savepoints_supported():
+        if not self._savepoints_supported:
             raise DBALConnectionError.savepoints_not_supported()
         self._nest_transactions_with_savepoints = bool(nest_transactions_with_savepoints)
 
@@ -488,7 +811,10 @@ class Connection:
         :return: a string with the savepoint name or false
         :rtype: str
         """
-        return "PYDBAL_SAVEPOINT_" + str(self._transaction_nesting_level)
+        try:
+            return Connection._SAVEPOINT_NAMES[self._transaction_nesting_level]
+        except IndexError:
+            return "PYDBAL_SAVEPOINT_%d" % self._transaction_nesting_level
 
     def create_savepoint(self, savepoint):
         """Creates a new savepoint.
@@ -496,7 +822,7 @@ class Connection:
         :param savepoint: the name of the savepoint to create
         :raise: pydbal.exception.DBALConnectionError
         """
-        if not self._platform.is_savepoints_supported():
+        if not self._savepoints_supported:
             raise DBALConnectionError.savepoints_not_supported()
         self.ensure_connected()
         self._platform.create_savepoint(savepoint)
@@ -507,9 +833,9 @@ class Connection:
         :param savepoint: the name of the savepoint to release
         :raise: pydbal.exception.DBALConnectionError
         """
-        if not self._platform.is_savepoints_supported():
+        if not self._savepoints_supported:
             raise DBALConnectionError.savepoints_not_supported()
-        if self._platform.is_release_savepoints_supported():
+        if self._release_savepoints_supported:
             self.ensure_connected()
             self._platform.release_savepoint(savepoint)
 
@@ -519,7 +845,7 @@ class Connection:
         :param savepoint: the name of the savepoint to rollback to
         :raise: pydbal.exception.DBALConnectionError
         """
-        if not self._platform.is_savepoints_supported():
+        if not self._savepoints_supported:
             raise DBALConnectionError.savepoints_not_supported()
         self.ensure_connected()
         self._platform.rollback_savepoint(savepoint)
@@ -533,10 +859,61 @@ class Connection:
         """
         assert isinstance(values, dict)
 
+        if not self._inline_scalars:
+            self.execute(self._prepare_dml(("INSERT", table, tuple(values))), *values.values())
+            return self.last_insert_id()
+
         sb = self.sql_builder().insert(table)
-        for column, value in values.iteritems():
-            values[column] = sb.create_positional_parameter(value)
-        return sb.values(values).execute()
+        set_value, create_parameter = sb.set_value, self._create_parameter
+        for column, value in values.items():
+            set_value(column, create_parameter(sb, value))
+        return sb.execute()
+
+    def insert_many(self, table, rows, batch_size=1000):
+        """Inserts multiple table rows with specified data in batches of consecutive rows with the same columns.
+
+        Rows are inserted in the given order, so auto-increment IDs follow the order of rows.
+
+        :param table: the expression of the table to insert data into, quoted or unquoted
+        :param rows: an iterable of dictionaries containing column-value pairs
+        :param batch_size: maximum number of rows sent to the driver at once
+        :return: the number of affected rows
+        :rtype: int
+        """
+        assert batch_size > 0
+
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
+        def insert_batches(conn):
+            row_count = 0
+            key, columns, batch = None, (), []
+            for row in rows:
+                # pending batch is sent once columns change, so rows are not reordered
+                row_key = frozenset(row)
+                if row_key != key:
+                    if batch:
+                        row_count += conn._insert_batch(table, columns, batch)
+                    key, columns, batch = row_key, tuple(row), []
+                batch.append(tuple(row[column] for column in columns))
+                if len(batch) >= batch_size:
+                    row_count += conn._insert_batch(table, columns, batch)
+                    batch = []
+            if batch:
+                row_count += conn._insert_batch(table, columns, batch)
+            return row_count
+        return self.transaction(insert_batches)
+
+    def _insert_batch(self, table, columns, params):
+        """Inserts table rows with the same columns by a single driver call.
+
+        :param table: the expression of the table to insert data into, quoted or unquoted
+        :param columns: column names
+        :param params: a list of row values in order of columns
+        :return: the number of affected rows
+        :rtype: int
+        """
+        return self._statement.execute_many(self._prepare_dml(("INSERT", table, columns)), params) or 0
 
     def update(self, table, values, identifier):
         """Updates a table row with specified data by given identifier.
@@ -550,13 +927,15 @@ class Connection:
         assert isinstance(values, dict)
         assert isinstance(identifier, dict)
 
+        if self._is_plain_identifier(identifier):
+            sql = self._prepare_dml(("UPDATE", table, tuple(values), tuple(identifier)))
+            return self.execute(sql, *(list(values.values()) + list(identifier.values())))
+
         sb = self.sql_builder().update(table)
-        for column, value in values.iteritems():
-            sb.set(column, sb.create_positional_parameter(value))
-        for column, value in identifier.iteritems():
-            func = self._expr.in_ if isinstance(value, (list, tuple)) else self._expr.eq
-            sb.and_where(func(column, sb.create_positional_parameter(value)))
-        return sb.execute()
+        set_, create_parameter = sb.set, self._create_parameter
+        for column, value in values.items():
+            set_(column, create_parameter(sb, value))
+        return self._where_identifier(sb, identifier).execute()
 
     def delete(self, table, identifier):
         """Deletes a table row by given identifier.
@@ -568,8 +947,145 @@ class Connection:
         """
         assert isinstance(identifier, dict)
 
+        if self._is_plain_identifier(identifier):
+            return self.execute(self._prepare_dml(("DELETE", table, tuple(identifier))), *identifier.values())
+
         sb = self.sql_builder().delete(table)
-        for column, value in identifier.iteritems():
-            func = self._expr.in_ if isinstance(value, (list, tuple)) else self._expr.eq
-            sb.and_where(func(column, sb.create_positional_parameter(value)))
-        return sb.execute()
+        return self._where_identifier(sb, identifier).execute()
+
+    def _is_plain_identifier(self, identifier):
+        """Checks whether identifier criteria are all bound as `column = ?`, so SQL can be written without builder.
+
+        :param identifier: a dictionary containing column-value pairs
+        :return: `True` if no value needs `IN` or an inlined literal, `False` otherwise
+        :rtype: bool
+        """
+        if self._inline_scalars:
+            return False
+        is_sequence = Connection._is_sequence
+        for value in identifier.values():
+            if is_sequence(value):
+                return False
+        return True
+
+    def _prepare_dml(self, key):
+        """Returns prepared INSERT, UPDATE or DELETE SQL with positional parameters, formatting it on first use only.
+
+        :param key: tuple of statement type, table and column names; `("INSERT", table, columns)`,
+            `("UPDATE", table, columns, identifier_columns)` or `("DELETE", table, identifier_columns)`
+        :return: prepared SQL
+        :rtype: pydbal.statement.PreparedSQL
+        """
+        try:
+            return self._dml[key]
+        except KeyError:
+            pass
+
+        type_, table = key[0], key[1]
+        if type_ == "INSERT":
+            sql = "INSERT INTO %s (%s) VALUES(%s)" % (table, ", ".join(key[2]), ", ".join(("?", ) * len(key[2])))
+        elif type_ == "UPDATE":
+            sql = "UPDATE %s SET %s%s" % (
+                table, ", ".join(["%s = ?" % column for column in key[2]]), Connection._get_where_sql(key[3]))
+        else:
+            sql = "DELETE FROM %s%s" % (table, Connection._get_where_sql(key[2]))
+
+        prepared = self.prepare(sql)
+        if self._max_prepared > 0:
+            if len(self._dml) >= self._max_prepared:
+                self._dml.clear()
+            self._dml[key] = prepared
+        return prepared
+
+    @staticmethod
+    def _get_where_sql(columns):
+        """Returns WHERE clause matching every column to a positional parameter.
+
+        :param columns: identifier column names
+        :return: WHERE clause or empty string if there are no columns
+        :rtype: str
+        """
+        if not columns:
+            return ""
+        return " WHERE " + " AND ".join(["%s = ?" % column for column in columns])
+
+    def _where_identifier(self, sb, identifier):
+        """Adds identifier criteria to the WHERE clause of the SQL builder.
+
+        :param sb: SQL builder
+        :param identifier: a dictionary containing column-value pairs
+        :return: the SQL builder
+        :rtype: pydbal.builder.SQLBuilder
+        """
+        and_where, is_sequence = sb.and_where, Connection._is_sequence
+        for column, value in identifier.items():
+            if is_sequence(value):
+                and_where(_expr_in(column, sb.create_positional_parameter(tuple(value))))
+            elif value is None and self._inline_scalars:
+                and_where(_expr_is_null(column))
+            else:
+                and_where(_expr_eq(column, self._create_parameter(sb, value)))
+        return sb
+
+    @staticmethod
+    def _is_sequence(value):
+        """Checks whether identifier value is a sequence matched by `IN`.
+
+        :param value: identifier value
+        :return: `True` for lists, tuples and sets including their subclasses (e.g. named tuples), `False` otherwise
+        :rtype: bool
+        """
+        # exact type is looked up first, subclasses fall back to isinstance
+        return type(value) in Connection._SEQUENCE_TYPES or isinstance(value, Connection._SEQUENCE_BASES)
+
+    def _create_parameter(self, sb, value):
+        """Creates a positional parameter for the value, or returns it as an SQL literal if scalars are inlined.
+
+        :param sb: SQL builder
+        :param value: parameter value
+        :return: placeholder or SQL literal
+        :rtype: str
+        """
+        if self._inline_scalars:
+            type_ = type(value)
+            if value is None:
+                return "NULL"
+            elif type_ is bool:
+                return "1" if value else "0"
+            elif type_ is int or (type_ is float and -sys.float_info.max <= value <= sys.float_info.max):
+                return repr(value)
+        return sb.create_positional_parameter(value)
+
+
+def _finalize_connection(driver):
+    """Closes driver connection when `Connection` instance is garbage collected.
+
+    :param driver: connection driver
+    """
+    Connection._instance_count -= 1
+    driver.close()
+
+
+def _create_default_handler():
+    """Creates handler printing SQL to the standard error stream from a background thread where available.
+
+    :return: handler instance
+    :rtype: logging.Handler
+    """
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter(
+        "[%(levelname)1.1s %(asctime)s %(name)s] %(message)s",
+        "%y%m%d %H:%M:%S"))
+
+    try:
+        from logging.handlers import QueueHandler, QueueListener
+        from queue import Queue
+    except ImportError:  # Python < 3.2
+        return handler
+
+    queue = Queue(-1)
+    listener = QueueListener(queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return QueueHandler(queue)
@@ -22,124 +22,132 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
-from abc import ABCMeta, abstractmethod
+import logging
 
 
 class BaseDriver:
-    __metaclass__ = ABCMeta
+    __slots__ = ("_logger", "_driver_logger", "_platform", "_conn", "_server_version", "_server_version_info")
 
-    _server_version_info = None
-
-    _logger = None
-    _platform = None
-    _conn = None
-
-    @abstractmethod
-    def __init__(self, **params):
-        pass
-
-    def __del__(self):
-        self.close()
+    def __init__(self, logger=None, platform=None):
+        self._logger = logger
+        self._driver_logger = None
+        self._platform = platform
+        self._conn = None
+        self._server_version = None
+        self._server_version_info = None
 
     def _log(self, log, *params):
         logger = self.get_logger()
-        if logger is not None:
-            if params:
-                log += " " + str(list(params))
-            logger.debug(log)
+        if logger is None or not logger.isEnabledFor(logging.DEBUG):
+            return
+        if params:
+            log += " " + str(list(params))
+        logger.debug(log)
+
+    def _log_batch(self, sql, params):
+        # batch parameters are not logged, they could be large
+        self._log("%s -- batch of %d rows" % (sql, len(params)))
 
     def get_logger(self):
-        try:
-            # 'getChild' property available in Python 2.7+
-            return self._logger.getChild(self.get_name())
-        except AttributeError:
-            return self._logger
+        if self._driver_logger is None and self._logger is not None:
+            try:
+                # 'getChild' property available in Python 2.7+
+                self._driver_logger = self._logger.getChild(self.get_name())
+            except AttributeError:
+                self._driver_logger = self._logger
+        return self._driver_logger
 
     def get_platform(self):
         return self._platform
 
     def get_server_version(self):
-        info = self.get_server_version_info()
-        if info is None:
-            return None
-        return ".".join(map(str, info))
+        if self._server_version is None:
+            info = self.get_server_version_info()
+            if info is None:
+                return None
+            self._server_version = ".".join(map(str, info))
+        return self._server_version
 
     def get_server_version_info(self):
         if not self._server_version_info:
             self._server_version_info = self._get_server_version_info()
         return self._server_version_info
 
-    @abstractmethod
     def _get_server_version_info(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def get_database(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def connect(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def close(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def clear(self):
-        pass
+        raise NotImplementedError
 
     def is_connected(self):
         return self._conn is not None
 
-    @abstractmethod
     def error_code(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def error_info(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def execute(self, sql, *params):
-        pass
+        raise NotImplementedError
+
+    def execute_many(self, sql, params):
+        row_count = 0
+        for row in params:
+            row_count += self.execute(sql, *row) or 0
+        return row_count
 
     def execute_and_clear(self, sql, *params):
         self.execute(sql, *params)
         self.clear()
 
-    @abstractmethod
+    def execute_script(self, statements):
+        for sql in statements:
+            self.execute_and_clear(sql)
+
     def iterate(self):
-        pass
+        # drivers keep their cursor for the next statement, unless unread rows of the result are left to it, so a
+        # statement executed while iterating gets a new cursor and its result is kept when the iteration ends
+        raise NotImplementedError
+
+    def fetchall(self):
+        # overridden by drivers to fetch all rows with a single C call, bypassing iterate() generator
+        return list(self.iterate())
+
+    def fetchall_values(self):
+        # overridden by drivers to return rows as fetched, without pairing values with column names
+        return [tuple(value for _, value in row) for row in self.fetchall()]
 
-    @abstractmethod
     def row_count(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def last_insert_id(self, seq_name=None):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def begin_transaction(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def commit(self):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def rollback(self):
-        pass
+        raise NotImplementedError
 
     @staticmethod
     def get_placeholder():
         return "%s"
 
-    @abstractmethod
     def escape_string(self, value):
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
     def get_name(self):
-        pass
+        raise NotImplementedError
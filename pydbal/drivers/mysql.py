@@ -22,6 +22,8 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
+import socket
+
 import MySQLdb
 import MySQLdb.cursors
 
@@ -31,17 +33,22 @@ from pydbal.platforms.mysql import MySQLPlatform
 
 
 class MySQLDriver(BaseDriver):
-    _cursor = None
+    FETCH_SIZE = 100
+    RECONNECT_ERROR_CODES = frozenset((2006, 2013, 2055))
+
+    __slots__ = ("_params", "_cursor", "_result", "_keepalive")
 
     def __init__(self, host, user=None, password=None, database=None, port=3306, timeout=0, charset="utf8",
-                 timezone="SYSTEM", sql_mode="TRADITIONAL", **params):
-        self._logger = params.pop("logger")
-        self._platform = MySQLPlatform(self)
+                 timezone="SYSTEM", sql_mode="TRADITIONAL", buffered=True, keepalive=30, **params):
+        BaseDriver.__init__(self, params.pop("logger"), MySQLPlatform(self))
+        self._cursor = None
+        self._result = False
+        self._keepalive = keepalive
 
         self._params = dict(
             use_unicode=True, charset=charset, init_command=("SET time_zone = '%s'" % timezone),
             connect_timeout=timeout, sql_mode=sql_mode, autocommit=params.pop("auto_commit"),
-            cursorclass=MySQLdb.cursors.SSCursor, **params)
+            cursorclass=(MySQLdb.cursors.Cursor if buffered else MySQLdb.cursors.SSCursor), **params)
 
         if user is not None:
             self._params["user"] = user
@@ -71,17 +78,45 @@ class MySQLDriver(BaseDriver):
             self._conn = MySQLdb.connect(**self._params)
         except Exception as ex:
             raise DBALDriverError.driver_exception(self, ex)
+        if self._keepalive:
+            self._set_keepalive(self._keepalive)
+
+    def _set_keepalive(self, idle):
+        """Enables TCP keepalive probes, so connection dropped while idle is detected without waiting for a query
+        to time out.
+
+        Options are set where the platform supports them; UNIX socket connections are left unchanged.
+        """
+        try:
+            # duplicated descriptor shares socket options with the connection
+            sock = socket.fromfd(self._conn.fileno(), socket.AF_INET, socket.SOCK_STREAM)
+        except (AttributeError, socket.error):
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", max(idle // 3, 1)), ("TCP_KEEPCNT", 3)):
+                if hasattr(socket, option):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        except socket.error:
+            pass
+        finally:
+            sock.close()
 
     def close(self):
         self.clear()
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
         if self._conn is not None:
             self._conn.close()
             self._conn = None
 
     def clear(self):
-        if self._cursor is not None:
-            self._cursor.close()
-            self._cursor = None
+        # cursor is kept for the next statement, unread rows of the result are discarded
+        if self._result:
+            self._result = False
+            while self._cursor.nextset():
+                pass
 
     def error_code(self):
         return self._conn.errno()
@@ -105,7 +140,7 @@ class MySQLDriver(BaseDriver):
         try:
             return self._execute_unsafe(sql, params)
         except MySQLdb.OperationalError as ex:
-            if ex.args[0] in (2006, 2013, 2055):
+            if ex.args[0] in MySQLDriver.RECONNECT_ERROR_CODES:
                 self._log("Connection with server is lost. Trying to reconnect.")
                 self.connect()
                 return self._execute_unsafe(sql, params)
@@ -113,18 +148,75 @@ class MySQLDriver(BaseDriver):
 
     def _execute_unsafe(self, sql, params):
         self._log(sql, *params)
-        self._cursor = self._conn.cursor()
-        return self._cursor.execute(sql, params)
+        cursor = self._get_cursor()
+        # parameters are always passed, so '%%' escapes mean the same with and without parameters
+        result = cursor.execute(sql, params)
+        self._result = True
+        return result
+
+    def execute_many(self, sql, params):
+        try:
+            self._log_batch(sql, params)
+            result = self._get_cursor().executemany(sql, params)
+            self._result = True
+            return result
+        except MySQLdb.DatabaseError as ex:
+            raise DBALDriverError.execute_exception(self, ex, sql, params)
+
+    def _get_cursor(self):
+        if self._cursor is None or (self._result and self._cursor.description is not None):
+            self._cursor = self._conn.cursor()
+        self._result = False
+        return self._cursor
+
+    def execute_script(self, statements):
+        # MySQLdb enables multiple statements per query, so script is sent in a single round trip
+        sql = ";\n".join(statements)
+        try:
+            self._execute(sql, ())
+            self.clear()
+        except MySQLdb.DatabaseError as ex:
+            raise DBALDriverError.execute_exception(self, ex, sql)
 
     def iterate(self):
-        if self._cursor is None:
-            raise StopIteration
+        if not self._result:
+            return
+        if self._cursor.description is None:
+            self.clear()
+            return
+
+        # fetch rows in batches, each batch is fetched with a single C call
+        cursor = self._cursor
+        columns = [x[0] for x in cursor.description]
+        fetchmany = cursor.fetchmany
+        rows = fetchmany(self.FETCH_SIZE)
+        while rows:
+            for row in rows:
+                yield tuple(zip(columns, row))
+            rows = fetchmany(self.FETCH_SIZE)
+
+        if cursor is self._cursor:
+            self.clear()
+
+    def fetchall(self):
+        if not self._result:
+            return []
+        if self._cursor.description is None:
+            self.clear()
+            return []
 
         columns = [x[0] for x in self._cursor.description]
-        for row in self._cursor:
-            yield zip(columns, row)
+        rows = [tuple(zip(columns, row)) for row in self._cursor.fetchall()]
+        self.clear()
+        return rows
+
+    def fetchall_values(self):
+        if not self._result:
+            return []
 
+        rows = list(self._cursor.fetchall()) if self._cursor.description is not None else []
         self.clear()
+        return rows
 
     def row_count(self):
         return self._conn.affected_rows()
@@ -144,7 +236,20 @@ class MySQLDriver(BaseDriver):
         self._conn.rollback()
 
     def escape_string(self, value):
-        return self._conn.literal(value)
+        # common scalars are converted without MySQLdb converters lookup
+        type_ = type(value)
+        if value is None:
+            return "NULL"
+        elif type_ is bool:
+            return "1" if value else "0"
+        elif type_ is int:
+            return str(value)
+
+        literal = self._conn.literal(value)
+        if isinstance(literal, bytes) and not isinstance(literal, str):
+            # MySQLdb returns literals encoded with connection charset in Python 3
+            literal = literal.decode(getattr(self._conn, "encoding", "utf8"))
+        return literal
 
     def get_name(self):
         return "mysql"
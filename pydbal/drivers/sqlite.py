@@ -25,18 +25,75 @@ from __future__ import absolute_import, division, print_function, with_statement
 import sqlite3
 import warnings
 
+from threading import Lock
+from collections import deque
+
 from pydbal.drivers import BaseDriver
 from pydbal.exception import DBALDriverError, DBALNotImplementedWarning
 from pydbal.platforms.sqlite import SQLitePlatform
 
 
+def _connect(params, pragmas):
+    conn = sqlite3.connect(**params)
+    for name, value in pragmas.items():
+        # e.g. WAL journal mode is silently ignored by in-memory databases
+        conn.execute("PRAGMA %s = %s" % (name, value)).close()
+    return conn
+
+
+class SQLitePool:
+    __slots__ = ("_params", "_pragmas", "_max_size", "_idle", "_lock")
+
+    def __init__(self, params, pragmas, max_size):
+        self._params = params
+        self._pragmas = pragmas
+        self._max_size = max_size
+        self._idle = deque()
+        self._lock = Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                # most recently used connection has the warmest page cache
+                return self._idle.pop()
+        return _connect(self._params, self._pragmas)
+
+    def release(self, conn):
+        conn.rollback()
+        with self._lock:
+            if len(self._idle) < self._max_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for conn in idle:
+            conn.close()
+
+
 class SQLiteDriver(BaseDriver):
-    _cursor = None
-    _error = None
+    FETCH_SIZE = 1000
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "cache_size": -65536,
+        "mmap_size": 268435456
+    }
 
-    def __init__(self, database, timeout=5.0, **params):
-        self._logger = params.pop("logger")
-        self._platform = SQLitePlatform(self)
+    _pools = {}
+    _pools_lock = Lock()
+
+    __slots__ = ("_params", "_pragmas", "_pool", "_cursor", "_result", "_error")
+
+    def __init__(self, database, timeout=5.0, pragmas=None, pool_size=0, **params):
+        BaseDriver.__init__(self, params.pop("logger"), SQLitePlatform(self))
+        self._pragmas = SQLiteDriver.PRAGMAS if pragmas is None else pragmas
+        self._cursor = None
+        self._result = False
+        self._error = None
 
         auto_commit = params.pop("auto_commit")
         if auto_commit:
@@ -44,7 +101,23 @@ class SQLiteDriver(BaseDriver):
         else:
             params["isolation_level"] = "EXCLUSIVE"
 
+        # in-memory databases are private to the connection and can not be shared through a pool
+        pooled = pool_size and database not in ("", ":memory:")
+        if pooled:
+            # pooled connection may be released and acquired again by different threads
+            params["check_same_thread"] = False
+
         self._params = dict(database=database, timeout=timeout, **params)
+        self._pool = SQLiteDriver._get_pool(self._params, self._pragmas, pool_size) if pooled else None
+
+    @staticmethod
+    def _get_pool(params, pragmas, max_size):
+        key = (tuple(sorted(params.items())), tuple(sorted(pragmas.items())), max_size)
+        with SQLiteDriver._pools_lock:
+            pool = SQLiteDriver._pools.get(key)
+            if pool is None:
+                pool = SQLiteDriver._pools[key] = SQLitePool(params, pragmas, max_size)
+        return pool
 
     def _get_server_version_info(self):
         return sqlite3.sqlite_version_info
@@ -52,26 +125,32 @@ class SQLiteDriver(BaseDriver):
     def get_database(self):
         return self._params["database"]
 
-    @staticmethod
-    def _row_factory(cursor, row):
-        return tuple((cursor.description[i][0], value) for i, value in enumerate(row))
-
     def connect(self):
         self.close()
         try:
-            self._conn = sqlite3.connect(**self._params)
-            self._conn.row_factory = self._row_factory
+            if self._pool is None:
+                self._conn = _connect(self._params, self._pragmas)
+            else:
+                self._conn = self._pool.acquire()
         except Exception as ex:
             raise DBALDriverError.driver_exception(self, ex)
 
     def close(self):
         self.clear()
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
         if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+            conn, self._conn = self._conn, None
+            if self._pool is None:
+                conn.close()
+            else:
+                self._pool.release(conn)
 
     def clear(self):
-        if self._cursor is not None:
+        # cursor is kept for the next statement, unless unread rows of the result keep its statement active
+        if self._result:
+            self._result = False
             self._cursor.close()
             self._cursor = None
 
@@ -86,27 +165,90 @@ class SQLiteDriver(BaseDriver):
         try:
             self._log(sql, *params)
             self._error = None
-            self._cursor = self._conn.execute(sql, params)
-            return self.row_count()
+            cursor = self._get_cursor()
+            cursor.execute(sql, params)
+            self._result = cursor.description is not None
+            return cursor.rowcount
+        except Exception as ex:
+            if isinstance(ex, sqlite3.OperationalError):
+                self._error = str(ex)
+            raise DBALDriverError.execute_exception(self, ex, sql, params)
+
+    def execute_many(self, sql, params):
+        try:
+            self._log_batch(sql, params)
+            self._error = None
+            cursor = self._get_cursor()
+            cursor.executemany(sql, params)
+            return cursor.rowcount
         except Exception as ex:
             if isinstance(ex, sqlite3.OperationalError):
-                self._error = ex.message
+                self._error = str(ex)
             raise DBALDriverError.execute_exception(self, ex, sql, params)
 
+    def _get_cursor(self):
+        if self._cursor is None or self._result:
+            self._cursor = self._conn.cursor()
+        self._result = False
+        return self._cursor
+
+    def execute_script(self, statements):
+        statements = list(statements)
+        sql = ";\n".join(statements)
+        try:
+            self._log(sql)
+            self._error = None
+            if getattr(self._conn, "in_transaction", True):
+                # executescript() would commit pending transaction first, which Python 2 does not report
+                for statement in statements:
+                    self._conn.execute(statement).close()
+            else:
+                self._conn.executescript(sql)
+        except Exception as ex:
+            if isinstance(ex, sqlite3.OperationalError):
+                self._error = str(ex)
+            raise DBALDriverError.execute_exception(self, ex, sql)
+
     def iterate(self):
-        if self._cursor is None:
-            raise StopIteration
+        if not self._result:
+            return
 
-        for row in self._cursor:
-            yield row
+        # column names are resolved once per result, rows are fetched as plain tuples in batches
+        cursor = self._cursor
+        columns = tuple(x[0] for x in cursor.description)
+        fetchmany = cursor.fetchmany
+        rows = fetchmany(self.FETCH_SIZE)
+        while rows:
+            for row in rows:
+                yield tuple(zip(columns, row))
+            rows = fetchmany(self.FETCH_SIZE)
 
-        self.clear()
+        # statement is reset by sqlite3 once all rows are read
+        if cursor is self._cursor:
+            self._result = False
+
+    def fetchall(self):
+        if not self._result:
+            return []
+
+        columns = tuple(x[0] for x in self._cursor.description)
+        rows = [tuple(zip(columns, row)) for row in self._cursor.fetchall()]
+        self._result = False
+        return rows
+
+    def fetchall_values(self):
+        if not self._result:
+            return []
+
+        rows = self._cursor.fetchall()
+        self._result = False
+        return rows
 
     def row_count(self):
-        return getattr(self._cursor, "rowcount", 0)
+        return self._cursor.rowcount if self._cursor is not None else 0
 
     def last_insert_id(self, seq_name=None):
-        return getattr(self._cursor, "lastrowid", None)
+        return self._cursor.lastrowid if self._cursor is not None else None
 
     def begin_transaction(self):
         self.execute_and_clear("BEGIN TRANSACTION")
@@ -124,6 +266,14 @@ class SQLiteDriver(BaseDriver):
         return "?"
 
     def escape_string(self, value):
+        # common scalars are converted directly, only strings need quoting
+        type_ = type(value)
+        if value is None:
+            return "NULL"
+        elif type_ is bool:
+            return "1" if value else "0"
+        elif type_ is int:
+            return str(value)
         return "'" + value.replace("'", "''") + "'"
 
     def get_name(self):
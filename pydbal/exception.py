@@ -24,10 +24,12 @@ from __future__ import absolute_import, division, print_function, with_statement
 
 
 class DBALError(Exception):
-    pass
+    __slots__ = ()
 
 
 class DBALConnectionError(DBALError):
+    __slots__ = ()
+
     @classmethod
     def unknown_driver(cls, unknown_driver_name, known_driver_names):
         return cls(
@@ -54,29 +56,50 @@ class DBALConnectionError(DBALError):
     def may_not_alter_nested_transaction_with_savepoints_in_transaction(cls):
         return cls("May not alter the nested transaction with savepoints behavior while a transaction is open.")
 
+    @classmethod
+    def pool_exhausted(cls, max_size, timeout):
+        return cls("All %d pooled connections are in use, none was released within %s seconds." % (max_size, timeout))
+
 
 class DBALDriverError(DBALError):
-    def __init__(self, *args, **kwargs):
-        self._driver_exception = kwargs.pop("exception")
-        args = ("%s: %s." % (args[0], self._driver_exception), ) + args[1:]
-        super(DBALDriverError, self).__init__(*args, **kwargs)
+    MAX_PARAMS = 10  # number of parameters included in the message
+
+    __slots__ = ("_driver_exception", "_params")
+
+    def __init__(self, message, exception, params=None):
+        super(DBALDriverError, self).__init__(message)
+        self._driver_exception = exception
+        self._params = params
+
+    def __str__(self):
+        # parameters are only converted when message is needed, since they can be large (e.g. batch of rows)
+        message = self.args[0]
+        if self._params:
+            params = str(list(self._params[:DBALDriverError.MAX_PARAMS]))
+            if len(self._params) > DBALDriverError.MAX_PARAMS:
+                params = params[:-1] + ", ...]"
+            message += " with parameters " + params
+        return "%s: %s." % (message, self._driver_exception)
 
     def get_driver_exception(self):
         return self._driver_exception
 
+    def get_params(self):
+        return self._params
+
     @classmethod
     def driver_exception(cls, driver, exception):
-        return cls("An exception occurred in driver '%s'" % driver.get_name(), exception=exception)
+        return cls("An exception occurred in driver '%s'" % driver.get_name(), exception)
 
     @classmethod
     def execute_exception(cls, driver, exception, sql, params=None):
-        message = "An exception occurred in driver '%s' while executing '%s'" % (driver.get_name(), sql)
-        if params:
-            message += " with parameters " + str(list(params))
-        return cls(message, exception=exception)
+        return cls("An exception occurred in driver '%s' while executing '%s'" % (driver.get_name(), sql), exception,
+                   params)
 
 
 class DBALPlatformError(DBALError):
+    __slots__ = ()
+
     @classmethod
     def not_supported(cls, method):
         return cls("Operation '%s' is not supported by platform." % method.__name__)
@@ -99,6 +122,8 @@ class DBALPlatformError(DBALError):
 
 
 class DBALStatementError(DBALError):
+    __slots__ = ()
+
     @classmethod
     def missing_positional_parameter(cls, param_index, params):
         return cls(
@@ -110,6 +135,8 @@ class DBALStatementError(DBALError):
 
 
 class DBALBuilderError(DBALError):
+    __slots__ = ()
+
     @classmethod
     def unknown_alias(cls, alias, registered_aliases):
         return cls(
@@ -124,14 +151,16 @@ class DBALBuilderError(DBALError):
 
 
 class DBALTypesError(DBALError):
+    __slots__ = ()
+
     @classmethod
     def unknown_type(cls, name):
         return cls("Unknown column type '%s' requested." % name)
 
 
 class DBALWarning(Warning):
-    pass
+    __slots__ = ()
 
 
 class DBALNotImplementedWarning(DBALWarning):
-    pass
+    __slots__ = ()
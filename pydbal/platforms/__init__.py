@@ -26,23 +26,30 @@ import re
 
 from abc import ABCMeta, abstractmethod
 
-from pydbal.connection import Connection
-from pydbal.exception import DBALPlatformError
+from pydbal.exception import DBALDriverError, DBALPlatformError
 
 
-class BasePlatform:
-    __metaclass__ = ABCMeta
+# abstract base class valid in both Python 2 and 3 ('__metaclass__' attribute is ignored by Python 3)
+_ABC = ABCMeta("ABC", (object, ), {"__slots__": ()})
 
-    _re_table_column_type = re.compile(r"^(?P<type>\w*)\s*(?:\(\s*(?P<length>\d+(?:,\d+)?)\s*\))?")
-    _re_comment_type = re.compile(r"\s*\(DBALType:(?P<type>\w+)\)\s*")
-    _keywords = None
+
+class BasePlatform(_ABC):
+    # column types are ASCII, matching skips Unicode character tables ('re.ASCII' is Python 3 only)
+    _re_table_column_type = re.compile(
+        r"^(?P<type>\w*)\s*(?:\(\s*(?P<length>\d+(?:,\d+)?)\s*\))?", getattr(re, "ASCII", 0))
+    _re_comment_type = re.compile(r"\s*\(DBALType:(?P<type>\w+)\)\s*", getattr(re, "ASCII", 0))
+
+    __slots__ = ("_driver", "_keywords", "_type_mappings")
 
     def __init__(self, driver):
         self._driver = driver
+        self._keywords = None
+        self._type_mappings = None
 
-    def _fetch(self, sql):
-        self._driver.execute(sql)
-        return self._driver.iterate()
+    def _fetch(self, sql, *params):
+        # platform queries select columns in a fixed order, so rows are read as plain value tuples
+        self._driver.execute(sql, *params)
+        return self._driver.fetchall_values()
 
     def get_keywords(self):
         if self._keywords is None:
@@ -58,32 +65,35 @@ class BasePlatform:
         pass
 
     def get_type_mapping(self, type_):
-        mappings = self._get_type_mappings()
-        if type_ not in mappings:
+        if self._type_mappings is None:
+            self._type_mappings = self._get_type_mappings()
+        try:
+            return self._type_mappings[type_]
+        except KeyError:
             raise DBALPlatformError.unknown_column_type(type_)
-        return mappings[type_]
 
     @staticmethod
     def get_type_from_comment(comment, default=None):
-        def replace(match):
-            replace._type = match.group("type")
-            return ""
-
-        replace._type = default
-        comment = BasePlatform._re_comment_type.sub(replace, comment)
-        return comment, replace._type
+        match = BasePlatform._re_comment_type.search(comment)
+        if match is None:
+            return comment, default
+        return comment[:match.start()] + comment[match.end():], match.group("type")
 
     def quote_identifier(self, identifier):
-        return ".".join(map(self.quote_single_identifier, identifier.split(".")))
+        if "." not in identifier:
+            return self.quote_single_identifier(identifier)
+        return ".".join([self.quote_single_identifier(x) for x in identifier.split(".")])
 
     def quote_single_identifier(self, identifier):
         c = self.get_identifier_quote_character()
-        return c + identifier.replace(c, c + c) + c
+        return "%s%s%s" % (c, identifier.replace(c, c + c), c)
 
     def get_identifier_quote_character(self):
         return '"'
 
     def modify_limit_sql(self, sql, limit, offset=None):
+        if limit is None and offset is None:
+            return sql
         if limit is not None:
             limit = int(limit)
         if offset is not None:
@@ -95,11 +105,12 @@ class BasePlatform:
         return self._modify_limit_sql(sql, limit, offset)
 
     def _modify_limit_sql(self, sql, limit, offset):
-        if limit is not None:
-            sql += " LIMIT " + str(limit)
-        if offset is not None:
-            sql += " OFFSET " + str(offset)
-        return sql
+        # at least one of limit and offset is set
+        if offset is None:
+            return "%s LIMIT %d" % (sql, limit)
+        if limit is None:
+            return "%s OFFSET %d" % (sql, offset)
+        return "%s LIMIT %d OFFSET %d" % (sql, limit, offset)
 
     @staticmethod
     def is_limit_offset_supported():
@@ -116,31 +127,72 @@ class BasePlatform:
     def is_foreign_keys_supported():
         return True
 
+    @staticmethod
+    def get_create_savepoint_sql(savepoint):
+        return "SAVEPOINT %s" % savepoint
+
+    @staticmethod
+    def get_release_savepoint_sql(savepoint):
+        return "RELEASE SAVEPOINT %s" % savepoint
+
+    @staticmethod
+    def get_rollback_savepoint_sql(savepoint):
+        return "ROLLBACK TO SAVEPOINT %s" % savepoint
+
     def create_savepoint(self, savepoint):
-        self._driver.execute_and_clear("SAVEPOINT " + savepoint)
+        self._driver.execute_and_clear(self.get_create_savepoint_sql(savepoint))
 
     def release_savepoint(self, savepoint):
-        self._driver.execute_and_clear("RELEASE SAVEPOINT " + savepoint)
+        self._driver.execute_and_clear(self.get_release_savepoint_sql(savepoint))
 
     def rollback_savepoint(self, savepoint):
-        self._driver.execute_and_clear("ROLLBACK TO SAVEPOINT " + savepoint)
+        self._driver.execute_and_clear(self.get_rollback_savepoint_sql(savepoint))
+
+    def execute_in_savepoint(self, savepoint, statements):
+        script = [self.get_create_savepoint_sql(savepoint)]
+        script.extend(statements)
+        if self.is_release_savepoints_supported():
+            script.append(self.get_release_savepoint_sql(savepoint))
+
+        try:
+            self._driver.execute_script(script)
+        except DBALDriverError:
+            try:
+                self.rollback_savepoint(savepoint)
+            except DBALDriverError:
+                pass  # savepoint was not created
+            raise
 
     def _get_transaction_isolation_sql(self, level):
-        if level == Connection.TRANSACTION_READ_UNCOMMITTED:
-            return "READ UNCOMMITTED"
-        elif level == Connection.TRANSACTION_READ_COMMITTED:
-            return "READ COMMITTED"
-        elif level == Connection.TRANSACTION_REPEATABLE_READ:
-            return "REPEATABLE READ"
-        elif level == Connection.TRANSACTION_SERIALIZABLE:
-            return "SERIALIZABLE"
-        raise DBALPlatformError.invalid_isolation_level(level)
+        try:
+            return self._get_transaction_isolation_sqls()[level]
+        except KeyError:
+            raise DBALPlatformError.invalid_isolation_level(level)
+
+    @classmethod
+    def _get_transaction_isolation_sqls(cls):
+        # mapping is created on first use, so importing platform does not import connection module
+        sqls = cls.__dict__.get("_transaction_isolation_sqls")
+        if sqls is None:
+            sqls = cls._transaction_isolation_sqls = cls._create_transaction_isolation_sqls()
+        return sqls
+
+    @staticmethod
+    def _create_transaction_isolation_sqls():
+        from pydbal.connection import Connection
+        return {
+            Connection.TRANSACTION_READ_UNCOMMITTED: "READ UNCOMMITTED",
+            Connection.TRANSACTION_READ_COMMITTED: "READ COMMITTED",
+            Connection.TRANSACTION_REPEATABLE_READ: "REPEATABLE READ",
+            Connection.TRANSACTION_SERIALIZABLE: "SERIALIZABLE"
+        }
 
     def set_transaction_isolation(self, level):
         raise DBALPlatformError.not_supported(self.set_transaction_isolation)
 
     @staticmethod
     def get_default_transaction_isolation_level():
+        from pydbal.connection import Connection
         return Connection.TRANSACTION_READ_COMMITTED
 
     def get_databases(self):
@@ -155,8 +207,20 @@ class BasePlatform:
     def get_table_columns(self, table, database=None):
         raise DBALPlatformError.not_supported(self.get_table_columns)
 
+    def get_all_table_columns(self, database=None):
+        for table in self.get_tables(database):
+            yield table, list(self.get_table_columns(table, database))
+
     def get_table_indexes(self, table, database=None):
         raise DBALPlatformError.not_supported(self.get_table_indexes)
 
+    def get_all_table_indexes(self, database=None):
+        for table in self.get_tables(database):
+            yield table, list(self.get_table_indexes(table, database))
+
     def get_table_foreign_keys(self, table, database=None):
         raise DBALPlatformError.not_supported(self.get_table_foreign_keys)
+
+    def get_all_table_foreign_keys(self, database=None):
+        for table in self.get_tables(database):
+            yield table, list(self.get_table_foreign_keys(table, database))
@@ -24,12 +24,14 @@ from __future__ import absolute_import, division, print_function, with_statement
 
 import itertools
 
+from operator import itemgetter
+
 from pydbal.platforms import BasePlatform
 from pydbal.types import BaseType
 
 
 class MySQLPlatform(BasePlatform):
-    _KEYWORDS = (
+    _KEYWORDS = frozenset((
         "ADD", "ALL", "ALTER", "ANALYZE", "AND", "AS", "ASC", "ASENSITIVE", "BEFORE", "BETWEEN", "BIGINT", "BINARY",
         "BLOB", "BOTH", "BY", "CALL", "CASCADE", "CASE", "CHANGE", "CHAR", "CHARACTER", "CHECK", "COLLATE", "COLUMN",
         "CONDITION", "CONNECTION", "CONSTRAINT", "CONTINUE", "CONVERT", "CREATE", "CROSS", "CURRENT_DATE",
@@ -53,8 +55,8 @@ class MySQLPlatform(BasePlatform):
         "UNION", "UNIQUE", "UNLOCK", "UNSIGNED", "UPDATE", "USAGE", "USE", "USING", "UTC_DATE", "UTC_TIME",
         "UTC_TIMESTAMP", "VALUES", "VARBINARY", "VARCHAR", "VARCHARACTER", "VARYING", "WHEN", "WHERE", "WHILE", "WITH",
         "WRITE", "X509", "XOR", "YEAR_MONTH", "ZEROFILL"
-    )
-    _KEYWORDS57 = (
+    ))
+    _KEYWORDS57 = frozenset((
         "ACCESSIBLE", "ADD", "ALL", "ALTER", "ANALYZE", "AND", "AS", "ASC", "ASENSITIVE", "BEFORE", "BETWEEN", "BIGINT",
         "BINARY", "BLOB", "BOTH", "BY", "CALL", "CASCADE", "CASE", "CHANGE", "CHAR", "CHARACTER", "CHECK", "COLLATE",
         "COLUMN", "CONDITION", "CONSTRAINT", "CONTINUE", "CONVERT", "CREATE", "CROSS", "CURRENT_DATE", "CURRENT_TIME",
@@ -79,7 +81,7 @@ class MySQLPlatform(BasePlatform):
         "TRIGGER", "TRUE", "UNDO", "UNION", "UNIQUE", "UNLOCK", "UNSIGNED", "UPDATE", "USAGE", "USE", "USING",
         "UTC_DATE", "UTC_TIME", "UTC_TIMESTAMP", "VALUES", "VARBINARY", "VARCHAR", "VARCHARACTER", "VARYING", "WHEN",
         "WHERE", "WHILE", "WITH", "WRITE", "XOR", "YEAR_MONTH", "ZEROFILL"
-    )
+    ))
 
     _TYPE_MAPPINGS = {
         "tinyint": BaseType.BOOLEAN,
@@ -121,8 +123,24 @@ class MySQLPlatform(BasePlatform):
     LENGTH_LIMIT_BLOB = 65535
     LENGTH_LIMIT_MEDIUMBLOB = 16777215
 
+    _FIXED_TYPES = frozenset(("char", "binary"))
+    _DECIMAL_TYPES = frozenset(("float", "double", "real", "numeric", "decimal"))
+    _INTEGER_TYPES = frozenset(("tinyint", "smallint", "mediumint", "int", "integer", "bigint", "year"))
+    _TYPE_LENGTHS = {
+        "tinytext": LENGTH_LIMIT_TINYTEXT,
+        "text": LENGTH_LIMIT_TEXT,
+        "mediumtext": LENGTH_LIMIT_MEDIUMTEXT,
+        "tinyblob": LENGTH_LIMIT_TINYBLOB,
+        "blob": LENGTH_LIMIT_BLOB,
+        "mediumblob": LENGTH_LIMIT_MEDIUMBLOB
+    }
+
+    __slots__ = ()
+
     def _get_keywords(self):
-        if self._driver.get_server_version() >= (5, 7):
+        # called once per platform instance, result is memoized by get_keywords()
+        version_info = self._driver.get_server_version_info()
+        if version_info is not None and tuple(version_info[:2]) >= (5, 7):
             return MySQLPlatform._KEYWORDS57
         return MySQLPlatform._KEYWORDS
 
@@ -133,145 +151,157 @@ class MySQLPlatform(BasePlatform):
         return "`"
 
     def _modify_limit_sql(self, sql, limit, offset):
-        if limit is not None:
-            sql += " LIMIT " + str(limit)
-            if offset is not None:
-                sql += " OFFSET " + str(offset)
-        elif offset is not None:
-            sql += " LIMIT 18446744073709551615 OFFSET " + str(offset)
-        return sql
+        if limit is None:
+            return "%s LIMIT 18446744073709551615 OFFSET %d" % (sql, offset)
+        return super(MySQLPlatform, self)._modify_limit_sql(sql, limit, offset)
 
     def set_transaction_isolation(self, level):
         self._driver.execute_and_clear(
-            "SET SESSION TRANSACTION ISOLATION LEVEL " + self._get_transaction_isolation_sql(level))
+            "SET SESSION TRANSACTION ISOLATION LEVEL %s" % self._get_transaction_isolation_sql(level))
 
     def get_databases(self):
         for row in self._fetch("SHOW DATABASES"):
-            yield row[0][1]  # {"Database": ...}
+            yield row[0]  # (Database, )
 
     def get_views(self, database=None):
-        database = "DATABASE()" if database is None else "'" + database + "'"
-        sql = "SELECT TABLE_NAME, VIEW_DEFINITION FROM INFORMATION_SCHEMA.VIEWS WHERE TABLE_SCHEMA = " + database + ""
-        for row in self._fetch(sql):  # [{"TABLE_NAME": ..., "VIEW_DEFINITION": ...}, ...]
-            yield row[0][1], row[1][1]
+        sql = "SELECT TABLE_NAME, VIEW_DEFINITION FROM INFORMATION_SCHEMA.VIEWS " \
+              "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE())"
+        for row in self._fetch(sql, database):  # [(TABLE_NAME, VIEW_DEFINITION), ...]
+            yield row
 
     def get_tables(self, database=None):
         for row in self._fetch("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'"):
-            yield row[0][1]
+            yield row[0]
 
     def get_table_columns(self, table, database=None):
-        database = "DATABASE()" if database is None else "'" + database + "'"
         sql = "SELECT COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA, COLUMN_COMMENT, COLLATION_NAME " \
-              "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = " + database + " AND TABLE_NAME = '" + table + "'"
-
-        for row in self._fetch(sql):
-            row = dict(row)
-
-            type_match = BasePlatform._re_table_column_type.match(row["COLUMN_TYPE"])
-            length = type_match.group("length")
-
-            options = {}
-
-            type_ = type_match.group("type")
-            if type_ in ("char", "binary"):
-                options["fixed"] = True
-            elif type_ in ("float", "double", "real", "numeric", "decimal") and length is not None:
+              "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s"
+        for row in self._fetch(sql, database, table):
+            yield self._get_column(*row)
+
+    def get_all_table_columns(self, database=None):
+        sql = "SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_DEFAULT, c.EXTRA, " \
+              "c.COLUMN_COMMENT, c.COLLATION_NAME FROM INFORMATION_SCHEMA.COLUMNS c " \
+              "INNER JOIN INFORMATION_SCHEMA.TABLES t ON t.TABLE_SCHEMA = c.TABLE_SCHEMA " \
+              "AND t.TABLE_NAME = c.TABLE_NAME WHERE c.TABLE_SCHEMA = COALESCE(%s, DATABASE()) " \
+              "AND t.TABLE_TYPE = 'BASE TABLE' ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION"
+        for table, group in itertools.groupby(self._fetch(sql, database), itemgetter(0)):
+            yield table, [self._get_column(*row[1:]) for row in group]
+
+    def _get_column(self, name, column_type, nullable, default, extra, comment, collation):
+        type_match = BasePlatform._re_table_column_type.match(column_type)
+        length = type_match.group("length")
+
+        options = {}
+
+        type_ = type_match.group("type")
+        if type_ in MySQLPlatform._FIXED_TYPES:
+            options["fixed"] = True
+        elif type_ in MySQLPlatform._DECIMAL_TYPES:
+            if length is not None:
                 decimal = (length + ",0").split(",")
                 options["precision"] = int(decimal[0])
                 options["scale"] = int(decimal[1])
                 length = None
-            elif type_ == "tinytext":
-                length = MySQLPlatform.LENGTH_LIMIT_TINYTEXT
-            elif type_ == "text":
-                length = MySQLPlatform.LENGTH_LIMIT_TEXT
-            elif type_ == "mediumtext":
-                length = MySQLPlatform.LENGTH_LIMIT_MEDIUMTEXT
-            elif type_ == "tinyblob":
-                length = MySQLPlatform.LENGTH_LIMIT_TINYBLOB
-            elif type_ == "blob":
-                length = MySQLPlatform.LENGTH_LIMIT_BLOB
-            elif type_ == "mediumblob":
-                length = MySQLPlatform.LENGTH_LIMIT_MEDIUMBLOB
-            elif type_ in ("tinyint", "smallint", "mediumint", "int", "integer", "bigint", "year"):
-                length = None
-
-            if length:
-                options["length"] = int(length)
-            if "unsigned" in row["COLUMN_TYPE"]:
-                options["unsigned"] = True
-            if row["IS_NULLABLE"] == "YES":
-                options["notnull"] = False
-            if row["COLUMN_DEFAULT"] is not None:
-                options["default"] = row["COLUMN_DEFAULT"]
-            if "auto_increment" in row["EXTRA"]:
-                options["autoincrement"] = True
-            if row["COLLATION_NAME"] is not None:
-                options["platform_options"] = {"collation": row["COLLATION_NAME"]}
-
-            type_ = self.get_type_mapping(type_)
-            if row["COLUMN_COMMENT"]:
-                comment, c_type = BasePlatform.get_type_from_comment(row["COLUMN_COMMENT"])
-                if comment:
-                    options["comment"] = row["COLUMN_COMMENT"]
-                if c_type:
-                    type_ = c_type
-
-            yield row["COLUMN_NAME"], type_, options
+        elif type_ in MySQLPlatform._INTEGER_TYPES:
+            length = None
+        else:
+            length = MySQLPlatform._TYPE_LENGTHS.get(type_, length)
+
+        if length:
+            options["length"] = int(length)
+        if "unsigned" in column_type:
+            options["unsigned"] = True
+        if nullable == "YES":
+            options["notnull"] = False
+        if default is not None:
+            options["default"] = default
+        if "auto_increment" in extra:
+            options["autoincrement"] = True
+        if collation is not None:
+            options["platform_options"] = {"collation": collation}
+
+        type_ = self.get_type_mapping(type_)
+        if comment:
+            c_comment, c_type = BasePlatform.get_type_from_comment(comment)
+            if c_comment:
+                options["comment"] = comment
+            if c_type:
+                type_ = c_type
+
+        return name, type_, options
 
     def get_table_indexes(self, table, database=None):
-        database = "DATABASE()" if database is None else "'" + database + "'"
         sql = "SELECT INDEX_NAME, COLUMN_NAME, INDEX_TYPE, NON_UNIQUE FROM INFORMATION_SCHEMA.STATISTICS " \
-              "WHERE TABLE_SCHEMA = " + database + " AND TABLE_NAME = '" + table + "'"
+              "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX"
 
-        indexes = []
-        for row in self._fetch(sql):
-            row = dict(row)
+        # rows are ordered by index, so each index is a single run of its columns in their order
+        for name, rows in itertools.groupby(self._fetch(sql, database, table), itemgetter(0)):
+            yield MySQLPlatform._get_index(name, list(rows))
 
-            options = {}
-            if not row["NON_UNIQUE"]:
-                options["unique"] = True
-            if row["INDEX_NAME"] == "PRIMARY":
-                options["primary"] = True
+    def get_all_table_indexes(self, database=None):
+        sql = "SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, INDEX_TYPE, NON_UNIQUE FROM INFORMATION_SCHEMA.STATISTICS " \
+              "WHERE TABLE_SCHEMA = COALESCE(%s, DATABASE()) ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
 
-            if "FULLTEXT" in row["INDEX_TYPE"]:
-                options["flags"] = ("FULLTEXT", )
-            elif "SPATIAL" in row["INDEX_TYPE"]:
-                options["flags"] = ("SPATIAL", )
+        for table, rows in itertools.groupby(self._fetch(sql, database), itemgetter(0)):
+            rows = (row[1:] for row in rows)
+            yield table, [MySQLPlatform._get_index(name, list(index_rows))
+                          for name, index_rows in itertools.groupby(rows, itemgetter(0))]
 
-            indexes.append((row["INDEX_NAME"], row["COLUMN_NAME"], options))
+    @staticmethod
+    def _get_index(name, rows):
+        _, _, index_type, non_unique = rows[0]
 
-        for group, generator in itertools.groupby(indexes, lambda x: (x[0], x[2])):
-            yield group[0], tuple(x[1] for x in generator), group[1]
+        options = {}
+        if not non_unique:
+            options["unique"] = True
+        if name == "PRIMARY":
+            options["primary"] = True
+
+        if "FULLTEXT" in index_type:
+            options["flags"] = ("FULLTEXT", )
+        elif "SPATIAL" in index_type:
+            options["flags"] = ("SPATIAL", )
+
+        return name, tuple(row[1] for row in rows), options
 
     def get_table_foreign_keys(self, table, database=None):
-        database = "DATABASE()" if database is None else "'" + database + "'"
-        sql = "SELECT DISTINCT k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME " \
-              "/*!50116 , c.UPDATE_RULE, c.DELETE_RULE */ FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE k " \
+        sql = "SELECT DISTINCT k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME, " \
+              "k.ORDINAL_POSITION /*!50116 , c.UPDATE_RULE, c.DELETE_RULE */ " \
+              "FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE k " \
+              "/*!50116 INNER JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS c " \
+              "ON c.CONSTRAINT_NAME = k.CONSTRAINT_NAME AND c.TABLE_NAME = %s */ " \
+              "WHERE k.TABLE_NAME = %s AND k.TABLE_SCHEMA = COALESCE(%s, DATABASE()) " \
+              "/*!50116 AND c.CONSTRAINT_SCHEMA = COALESCE(%s, DATABASE()) */ " \
+              "AND k.REFERENCED_COLUMN_NAME IS NOT NULL ORDER BY k.CONSTRAINT_NAME, k.ORDINAL_POSITION"
+
+        # rows are ordered by constraint, so each key is a single run of its columns in their order
+        for name, rows in itertools.groupby(self._fetch(sql, table, table, database, database), itemgetter(0)):
+            yield MySQLPlatform._get_foreign_key(name, list(rows))
+
+    def get_all_table_foreign_keys(self, database=None):
+        sql = "SELECT DISTINCT k.TABLE_NAME, k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME, " \
+              "k.REFERENCED_COLUMN_NAME, k.ORDINAL_POSITION /*!50116 , c.UPDATE_RULE, c.DELETE_RULE */ " \
+              "FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE k " \
               "/*!50116 INNER JOIN INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS c " \
-              "ON c.CONSTRAINT_NAME = k.CONSTRAINT_NAME AND c.TABLE_NAME = '" + table + "' */ " \
-              "WHERE k.TABLE_NAME = '" + table + "' AND k.TABLE_SCHEMA = " + database + " " \
-              "/*!50116 AND c.CONSTRAINT_SCHEMA = " + database + " */ AND k.REFERENCED_COLUMN_NAME IS NOT NULL"
-
-        foreign_keys = []
-        for row in self._fetch(sql):
-            row = dict(row)
-
-            options = {}
-            delete_rule = row.get("DELETE_RULE")
-            if delete_rule not in (None, "RESTRICT"):
-                options["on_delete"] = delete_rule
-            update_rule = row.get("UPDATE_RULE")
-            if update_rule not in (None, "RESTRICT"):
-                options["on_update"] = update_rule
-
-            foreign_keys.append((
-                row["CONSTRAINT_NAME"],
-                row["COLUMN_NAME"],
-                row["REFERENCED_TABLE_NAME"],
-                row["REFERENCED_COLUMN_NAME"],
-                options
-            ))
-
-        for group, generator in itertools.groupby(foreign_keys, lambda x: (x[0], x[2], x[4])):
-            gen1, gen2 = itertools.tee(generator)
-            yield group[0], tuple(x[1] for x in gen1), group[1], tuple(x[3] for x in gen2), group[2]
+              "ON c.CONSTRAINT_SCHEMA = k.TABLE_SCHEMA AND c.CONSTRAINT_NAME = k.CONSTRAINT_NAME " \
+              "AND c.TABLE_NAME = k.TABLE_NAME */ WHERE k.TABLE_SCHEMA = COALESCE(%s, DATABASE()) " \
+              "AND k.REFERENCED_COLUMN_NAME IS NOT NULL ORDER BY k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION"
+
+        for table, rows in itertools.groupby(self._fetch(sql, database), itemgetter(0)):
+            rows = (row[1:] for row in rows)
+            yield table, [MySQLPlatform._get_foreign_key(name, list(key_rows))
+                          for name, key_rows in itertools.groupby(rows, itemgetter(0))]
+
+    @staticmethod
+    def _get_foreign_key(name, rows):
+        # rules are selected by MySQL 5.1.16+ only
+        update_rule, delete_rule = rows[0][5:] or (None, None)
+
+        options = {}
+        if delete_rule not in (None, "RESTRICT"):
+            options["on_delete"] = delete_rule
+        if update_rule not in (None, "RESTRICT"):
+            options["on_update"] = update_rule
+
+        return name, tuple(row[1] for row in rows), rows[0][2], tuple(row[3] for row in rows), options
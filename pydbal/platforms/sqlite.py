@@ -25,15 +25,16 @@ from __future__ import absolute_import, division, print_function, with_statement
 import re
 import itertools
 
+from operator import itemgetter
+from collections import OrderedDict
+
 from pydbal.platforms import BasePlatform
 from pydbal.cache import cached
 from pydbal.types import BaseType
-from pydbal.connection import Connection
-from pydbal.exception import DBALPlatformError
 
 
 class SQLitePlatform(BasePlatform):
-    _KEYWORDS = (
+    _KEYWORDS = frozenset((
         "ABORT", "ACTION", "ADD", "AFTER", "ALL", "ALTER", "ANALYZE", "AND", "AS", "ASC", "ATTACH", "AUTOINCREMENT",
         "BEFORE", "BEGIN", "BETWEEN", "BY", "CASCADE", "CASE", "CAST", "CHECK", "COLLATE", "COLUMN", "COMMIT",
         "CONFLICT", "CONSTRAINT", "CREATE", "CROSS", "CURRENT_DATE", "CURRENT_TIME", "CURRENT_TIMESTAMP", "DATABASE",
@@ -45,7 +46,7 @@ class SQLitePlatform(BasePlatform):
         "REFERENCES", "REGEXP", "REINDEX", "RELEASE", "RENAME", "REPLACE", "RESTRICT", "RIGHT", "ROLLBACK", "ROW",
         "SAVEPOINT", "SELECT", "SET", "TABLE", "TEMP", "TEMPORARY", "THEN", "TO", "TRANSACTION", "TRIGGER", "UNION",
         "UNIQUE", "UPDATE", "USING", "VACUUM", "VALUES", "VIEW", "VIRTUAL", "WHEN", "WHERE"
-    )
+    ))
 
     _TYPE_MAPPINGS = {
         "boolean": BaseType.BOOLEAN,
@@ -83,10 +84,20 @@ class SQLitePlatform(BasePlatform):
         "blob": BaseType.BLOB
     }
 
+    _DECIMAL_TYPES = frozenset(("float", "double", "real", "decimal", "numeric"))
+
     _re_foreign_key_details = re.compile(
         r"(?:CONSTRAINT\s+([^\s]+)\s+)?(?:FOREIGN\s+KEY[^\)]+\)\s*)?REFERENCES\s+[^\s]+\s+(?:\([^\)]+\))?"
         r"(?:[^,]*?(NOT\s+DEFERRABLE|DEFERRABLE)(?:\s+INITIALLY\s+(DEFERRED|IMMEDIATE))?)?", re.IGNORECASE)
 
+    # CREATE TABLE statement is split into comments, quoted names and literals, parentheses, commas and other text
+    _re_create_table_tokens = re.compile(
+        r"--(?P<comment>[^\n]*)\n?|/\*.*?\*/|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`(?:[^`]|``)*`|\[[^\]]*\]|[(),]"
+        r"|[^-/'\"`\[(),]+|.", re.DOTALL)
+    _re_column_collation = re.compile(r"\bCOLLATE\s+[\"'`\[]?([^\s,\"'`\])]+)", re.IGNORECASE)
+
+    __slots__ = ()
+
     def _get_keywords(self):
         return SQLitePlatform._KEYWORDS
 
@@ -94,23 +105,23 @@ class SQLitePlatform(BasePlatform):
         return SQLitePlatform._TYPE_MAPPINGS
 
     def _modify_limit_sql(self, sql, limit, offset):
-        if limit is None and offset is not None:
-            return sql + " LIMIT -1 OFFSET " + str(offset)
+        if limit is None:
+            return "%s LIMIT -1 OFFSET %d" % (sql, offset)
         return super(SQLitePlatform, self)._modify_limit_sql(sql, limit, offset)
 
-    def _get_transaction_isolation_sql(self, level):
-        if level == Connection.TRANSACTION_READ_UNCOMMITTED:
-            return 0
-        elif level in (
-            Connection.TRANSACTION_READ_COMMITTED,
-            Connection.TRANSACTION_REPEATABLE_READ,
-            Connection.TRANSACTION_SERIALIZABLE
-        ):
-            return 1
-        raise DBALPlatformError.invalid_isolation_level(level)
+    @staticmethod
+    def _create_transaction_isolation_sqls():
+        from pydbal.connection import Connection
+        # value of 'read_uncommitted' PRAGMA
+        return {
+            Connection.TRANSACTION_READ_UNCOMMITTED: 1,
+            Connection.TRANSACTION_READ_COMMITTED: 0,
+            Connection.TRANSACTION_REPEATABLE_READ: 0,
+            Connection.TRANSACTION_SERIALIZABLE: 0
+        }
 
     def set_transaction_isolation(self, level):
-        self._driver.execute_and_clear("PRAGMA read_uncommitted = " + self._get_transaction_isolation_sql(level))
+        self._driver.execute_and_clear("PRAGMA read_uncommitted = %d" % self._get_transaction_isolation_sql(level))
 
     @staticmethod
     def _escape(name):
@@ -119,78 +130,144 @@ class SQLitePlatform(BasePlatform):
     @cached
     def _fetch_table_create_sql(self, table):
         sql = "SELECT sql FROM (SELECT * FROM sqlite_master UNION ALL SELECT * FROM sqlite_temp_master) " \
-              "WHERE type = 'table' AND name = '" + SQLitePlatform._escape(table) + "'"
-        return dict(next(self._fetch(sql))).get("sql", "")
+              "WHERE type = 'table' AND name = ?"
+        rows = self._fetch(sql, SQLitePlatform._escape(table))
+        return (rows[0][0] or "") if rows else ""
+
+    @cached
+    def _get_foreign_key_details(self, table):
+        return SQLitePlatform._re_foreign_key_details.findall(self._fetch_table_create_sql(table))
 
     def get_views(self, database=None):
         for row in self._fetch("SELECT name, sql FROM sqlite_master WHERE type = 'view' AND sql NOT NULL"):
-            yield row[0][1], row[1][1]  # {"name": ..., "sql": ...}
+            yield row  # (name, sql)
 
     def get_tables(self, database=None):
         sql = "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'sqlite_sequence' " \
               "AND name != 'geometry_columns' AND name != 'spatial_ref_sys' UNION ALL " \
               "SELECT name FROM sqlite_temp_master WHERE type = 'table' ORDER BY name"
-        for row in self._fetch(sql):  # [{"name": ...}, ...]
-            yield row[0][1]
+        for row in self._fetch(sql):  # [(name, ), ...]
+            yield row[0]
 
     def get_table_columns(self, table, database=None):
-        create_sql = self._fetch_table_create_sql(table)
-        for row in self._fetch("PRAGMA TABLE_INFO('" + SQLitePlatform._escape(table) + "')"):
-            row = dict(row)
+        definitions = SQLitePlatform._get_column_definitions(self._fetch_table_create_sql(table))
+        for row in self._fetch("PRAGMA TABLE_INFO('%s')" % SQLitePlatform._escape(table)):
+            yield self._get_column(definitions, *row[1:])
+
+    def get_all_table_columns(self, database=None):
+        if self._driver.get_server_version_info() < (3, 16):
+            # table-valued PRAGMA functions are not available, columns are read table by table
+            for table_columns in super(SQLitePlatform, self).get_all_table_columns(database):
+                yield table_columns
+            return
+
+        sql = "SELECT %(columns)s FROM sqlite_master m INNER JOIN pragma_table_info(m.name, 'main') p " \
+              "WHERE m.type = 'table' AND m.name NOT IN ('sqlite_sequence', 'geometry_columns', 'spatial_ref_sys') " \
+              "UNION ALL SELECT %(columns)s FROM sqlite_temp_master m INNER JOIN pragma_table_info(m.name, 'temp') p " \
+              "WHERE m.type = 'table' ORDER BY 1, 3" % {
+                  "columns": "m.name, m.sql, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk"}
+        for table, group in itertools.groupby(self._fetch(sql), itemgetter(0)):
+            group = list(group)
+            definitions = SQLitePlatform._get_column_definitions(group[0][1] or "")
+            yield table, [self._get_column(definitions, *row[3:]) for row in group]
 
-            type_match = BasePlatform._re_table_column_type.match(row["type"])
-            length = type_match.group("length")
+    @staticmethod
+    def _get_column_definitions(create_sql):
+        # table body is scanned once, comments following a definition (before or after its comma) belong to it
+        definitions = []
+        definition = target = None
+        depth = 0
+        for match in SQLitePlatform._re_create_table_tokens.finditer(create_sql):
+            token = match.group()
+            if depth == 0:
+                if token == "(":
+                    depth = 1
+                    definition = ([], [])
+                    definitions.append(definition)
+                continue
 
-            options = {}
+            comment = match.group("comment")
+            if comment is not None:
+                (target or definition)[1].append(comment.strip())
+                continue
+
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+                if depth == 0:
+                    break
+            elif token == "," and depth == 1:
+                target, definition = definition, ([], [])
+                definitions.append(definition)
+                continue
 
-            type_ = type_match.group("type").lower()
-            if type_ == "char":
-                options["fixed"] = True
-            elif type_ in ("float", "double", "real", "decimal", "numeric") and length is not None:
-                decimal = (length + ",0").split(",")
-                options["precision"] = int(decimal[0])
-                options["scale"] = int(decimal[1])
-                length = None
-            elif type_ == "integer" and row["pk"]:
-                options["autoincrement"] = True
-
-            if length:
-                options["length"] = int(length)
-            if "unsigned" in row["type"]:
-                options["unsigned"] = True
-            if not row["notnull"]:
-                options["notnull"] = False
-            if row["dflt_value"] not in (None, "NULL"):
-                options["default"] = row["dflt_value"]
-
-            name = row["name"].replace("'", "''")
-            type_ = self.get_type_mapping(type_)
-            if type_ in (BaseType.STRING, BaseType.TEXT):
-                re_ = r"(?:" + name + r")[^,(]+(?:\([^()]+\)[^,]*)?(?:(?:DEFAULT|CHECK)\s*(?:\(.*?\))?[^,]*)*" \
-                      r"COLLATE\s+[\"']?([^\s,\"')]+)"
-                matches = re.findall(re_, create_sql, re.IGNORECASE | re.DOTALL)
-                options["platform_options"] = {"collation": matches[0] if matches else "BINARY"}
-
-            re_ = r"[\s(,](?:" + name + r")(?:\(.*?\)|[^,(])*?,?((?:\s*--[^\n]*\n?)+)"
-            matches = re.findall(re_, create_sql, re.IGNORECASE | re.DOTALL)
-            if matches:
-                comment = re.sub(r"^\s*--\s*", "", matches[0].rstrip("\r\n"), flags=re.MULTILINE)
-                comment, c_type = BasePlatform.get_type_from_comment(comment)
-                if comment:
-                    options["comment"] = comment
-                if c_type:
-                    type_ = c_type
-
-            yield row["name"], type_, options
+            if not token.isspace():
+                target = None
+            definition[0].append(token)
+
+        columns = {}
+        for tokens, comments in definitions:
+            sql = "".join(tokens).strip()
+            if not sql:
+                continue
+            name = next(token for token in tokens if not token.isspace()).lstrip()
+            if name[0] in "\"`'[":
+                name = name[1:-1].replace(name[0] * 2, name[0])
+            else:
+                name = name.split()[0]
+            # column definitions precede table constraints
+            columns.setdefault(name.lower(), (sql, comments))
+        return columns
+
+    def _get_column(self, definitions, name, column_type, notnull, default, pk):
+        type_match = BasePlatform._re_table_column_type.match(column_type)
+        length = type_match.group("length")
+
+        options = {}
+
+        type_ = type_match.group("type").lower()
+        if type_ == "char":
+            options["fixed"] = True
+        elif type_ in SQLitePlatform._DECIMAL_TYPES and length is not None:
+            decimal = (length + ",0").split(",")
+            options["precision"] = int(decimal[0])
+            options["scale"] = int(decimal[1])
+            length = None
+        elif type_ == "integer" and pk:
+            options["autoincrement"] = True
+
+        if length:
+            options["length"] = int(length)
+        if "unsigned" in column_type:
+            options["unsigned"] = True
+        if not notnull:
+            options["notnull"] = False
+        if default not in (None, "NULL"):
+            options["default"] = default
+
+        sql, comments = definitions.get(name.lower(), ("", ()))
+        type_ = self.get_type_mapping(type_)
+        if type_ in (BaseType.STRING, BaseType.TEXT):
+            match = SQLitePlatform._re_column_collation.search(sql)
+            options["platform_options"] = {"collation": match.group(1) if match else "BINARY"}
+
+        if comments:
+            comment, c_type = BasePlatform.get_type_from_comment("\n".join(comments))
+            if comment:
+                options["comment"] = comment
+            if c_type:
+                type_ = c_type
+
+        return name, type_, options
 
     def get_table_indexes(self, table, database=None):
         table = SQLitePlatform._escape(table)
 
         primary = []
-        for row in self._fetch("PRAGMA TABLE_INFO('" + table + "')"):
-            row = dict(row)
-            if row.get("pk"):
-                primary.append(row["name"])
+        for row in self._fetch("PRAGMA TABLE_INFO('%s')" % table):
+            if row[5]:  # pk
+                primary.append(row[1])
 
         if primary:
             yield "PRIMARY", primary, {
@@ -198,54 +275,50 @@ class SQLitePlatform(BasePlatform):
                 "unique": True
             }
 
-        for row in self._fetch("PRAGMA INDEX_LIST('" + table + "')"):
-            row = dict(row)
-
-            name = row["name"]
+        for row in self._fetch("PRAGMA INDEX_LIST('%s')" % table):
+            name = row[1]
             if name.startswith("sqlite_"):
                 continue
 
             options = {}
-            if row["unique"]:
+            if row[2]:  # unique
                 options["unique"] = True
 
-            columns = self._fetch("PRAGMA INDEX_INFO('" + SQLitePlatform._escape(name) + "')")
-            yield name, [dict(column)["name"] for column in columns], options
+            columns = self._fetch("PRAGMA INDEX_INFO('%s')" % SQLitePlatform._escape(name))
+            yield name, [column[2] for column in columns], options
 
     def get_table_foreign_keys(self, table, database=None):
-        foreign_keys = []
-        for row in self._fetch("PRAGMA FOREIGN_KEY_LIST('" + SQLitePlatform._escape(table) + "')"):
-            row = dict(row)
+        # columns of a key are grouped by its id in a single pass
+        foreign_keys = OrderedDict()
+        for row in self._fetch("PRAGMA FOREIGN_KEY_LIST('%s')" % SQLitePlatform._escape(table)):
+            id_, _, foreign_table, local_column, foreign_column, update_rule, delete_rule = row[:7]
 
-            options = {}
-            delete_rule = row.get("on_delete")
-            if delete_rule not in (None, "RESTRICT"):
-                options["on_delete"] = delete_rule
-            update_rule = row.get("on_update")
-            if update_rule not in (None, "RESTRICT"):
-                options["on_update"] = update_rule
-
-            foreign_keys.append([
-                row["id"],
-                row["from"],
-                row["table"],
-                row["to"],
-                options
-            ])
+            foreign_key = foreign_keys.get(id_)
+            if foreign_key is None:
+                options = {}
+                if delete_rule not in (None, "RESTRICT"):
+                    options["on_delete"] = delete_rule
+                if update_rule not in (None, "RESTRICT"):
+                    options["on_update"] = update_rule
+
+                foreign_key = foreign_keys[id_] = [id_, [], foreign_table, [], options]
+
+            foreign_key[1].append(local_column)
+            foreign_key[3].append(foreign_column)
 
         if foreign_keys:
-            create_sql = self._fetch_table_create_sql(table)
-            matches = SQLitePlatform._re_foreign_key_details.findall(create_sql)
-            for i, details in enumerate(matches):
-                for foreign_key in foreign_keys:
-                    if foreign_key[0] != i:
-                        continue
-                    if details[1].upper() == "DEFERRABLE":
-                        foreign_key[4]["deferrable"] = True
-                    if details[2].upper() == "DEFERRED":
-                        foreign_key[4]["deferred"] = True
-                    foreign_key[0] = details[0]
-
-        for group, generator in itertools.groupby(foreign_keys, lambda x: (x[0], x[2], x[4])):
-            gen1, gen2 = itertools.tee(generator)
-            yield group[0], tuple(x[1] for x in gen1), group[1], tuple(x[3] for x in gen2), group[2]
+            matches = self._get_foreign_key_details(table)
+            for id_, foreign_key in foreign_keys.items():
+                # SQLite numbers foreign keys in reverse order of their declaration
+                index = len(matches) - 1 - id_
+                if index < 0:
+                    continue
+                details = matches[index]
+                if details[1].upper() == "DEFERRABLE":
+                    foreign_key[4]["deferrable"] = True
+                if details[2].upper() == "DEFERRED":
+                    foreign_key[4]["deferred"] = True
+                foreign_key[0] = details[0]
+
+        for name, local_columns, foreign_table, foreign_columns, options in foreign_keys.values():
+            yield name, tuple(local_columns), foreign_table, tuple(foreign_columns), options
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import time
+
+from threading import Condition
+from collections import deque
+from contextlib import contextmanager
+from pydbal.connection import Connection
+from pydbal.exception import DBALConnectionError
+
+
+class ConnectionPool:
+    MIN_SIZE = 0
+    MAX_SIZE = 10
+
+    def __init__(self, driver, min_size=MIN_SIZE, max_size=MAX_SIZE, idle_timeout=None, **params):
+        """Initialises pool of open database connections.
+
+        :param driver: database driver
+        :param min_size: number of connections to open in advance
+        :param max_size: maximum number of open connections, idle and checked out
+        :param idle_timeout: number of seconds after which idle connection is closed instead of reused, e.g. to stay
+            below MySQL `wait_timeout` (`None` to reuse connections regardless of idle time)
+        :param params: connection parameters
+        """
+        assert 0 <= min_size <= max_size and max_size > 0
+        assert idle_timeout is None or idle_timeout > 0
+
+        self._driver = driver
+        self._params = params
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+
+        self._idle = deque()
+        self._size = 0
+        self._condition = Condition()
+
+        for _ in range(min_size):
+            self._idle.append((self._create_connection(), time.time()))
+            self._size += 1
+
+    def _create_connection(self):
+        return Connection(self._driver, pool=self, **self._params)
+
+    def acquire(self, timeout=None):
+        """Checks out an idle connection from the pool, or opens a new one if the pool is below its maximum size.
+
+        If all connections are checked out, waits until one of them is released.
+
+        :param timeout: number of seconds to wait for a connection (`None` to wait until one is released)
+        :return: database connection
+        :rtype: pydbal.connection.Connection
+        :raise: pydbal.exception.DBALConnectionError
+        """
+        expired = []
+        try:
+            with self._condition:
+                deadline = None if timeout is None else time.time() + timeout
+                while True:
+                    if self._idle:
+                        conn, released = self._idle.pop()
+                        if self._idle_timeout is None or time.time() - released < self._idle_timeout:
+                            return conn
+                        # connections are reused in LIFO order, so all other idle connections expired as well
+                        expired.append(conn)
+                        expired.extend(idle_conn for idle_conn, _ in self._idle)
+                        self._idle.clear()
+                        self._size -= len(expired)
+
+                    if self._size < self._max_size:
+                        # slot is taken before the connection is opened outside the lock
+                        self._size += 1
+                        break
+
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise DBALConnectionError.pool_exhausted(self._max_size, timeout)
+                    # waiting thread is woken up by release() as soon as a connection is returned
+                    self._condition.wait(remaining)
+        finally:
+            for conn in expired:
+                conn.close()
+
+        try:
+            return self._create_connection()
+        except BaseException:
+            self._discard()
+            raise
+
+    def _discard(self):
+        # slot of a connection that was closed or failed to open is given to a waiting thread
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def release(self, conn):
+        """Returns connection to the pool, rolling back its unfinished transactions.
+
+        Connection is closed, if its transactions can not be rolled back.
+
+        :param conn: connection acquired from the pool
+        """
+        assert conn.get_pool() is self
+
+        try:
+            conn.rollback_all()
+        except BaseException:
+            conn.close()
+            self._discard()
+            raise
+
+        with self._condition:
+            self._idle.append((conn, time.time()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context generator for `with` statement, yields connection and returns it to the pool on exit.
+
+        :param timeout: number of seconds to wait for a connection (`None` to wait until one is released)
+        :return: database connection
+        :rtype: pydbal.connection.Connection
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes all idle connections in the pool."""
+        with self._condition:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for conn, _ in idle:
+            conn.close()
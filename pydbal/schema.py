@@ -28,6 +28,11 @@ from binascii import crc32
 from pydbal.types import BaseType
 from pydbal.cache import cached
 
+try:
+    _string_types = basestring
+except NameError:  # Python 3
+    _string_types = str
+
 
 class BaseAsset:
     __metaclass__ = ABCMeta
@@ -35,6 +40,7 @@ class BaseAsset:
     _name = None
     _namespace = None
     _quoted = False
+    _quoted_names = None
 
     def __repr__(self):
         return "<%s.%s> %s" % (
@@ -54,6 +60,7 @@ class BaseAsset:
         if "." in name:
             self._namespace, name = name.split(".", 1)
         self._name = name
+        self._quoted_names = None
 
     def get_name(self):
         if self._namespace:
@@ -63,28 +70,51 @@ class BaseAsset:
     def get_namespace(self):
         return self._namespace
 
+    @staticmethod
+    def _get_lower_name(item):
+        try:
+            return item.get_name().lower()
+        except AttributeError:
+            return item.lower()
+
     @staticmethod
     def _is_identifier_quoted(identifier):
         return identifier[:1] in ("`", '"', "[")
 
     @staticmethod
     def _trim_quotes(identifier):
-        return identifier.encode("utf-8").translate(None, '`"[]')
+        for quote in '`"[]':
+            identifier = identifier.replace(quote, "")
+        return identifier
 
     def _get_quoted_name(self, platform):
+        # quoted name is kept per platform, as it only changes with the name
+        quoted_names = self._quoted_names
+        if quoted_names is None:
+            quoted_names = self._quoted_names = {}
+        elif platform in quoted_names:
+            return quoted_names[platform]
+
         keywords = platform.get_keywords()
 
         def quote(identifier):
             if self._quoted or identifier in keywords:
                 return platform.quote_single_identifier(identifier)
             return identifier
-        return ".".join(map(quote, self.get_name().split(".")))
+        quoted_names[platform] = quoted_name = ".".join(map(quote, self.get_name().split(".")))
+        return quoted_name
 
     @staticmethod
     def _generate_identifier_name(column_names, prefix="", max_size=30):
-        def encode(column_name):
-            return "%X" % (crc32(column_name) & 0xffffffff)
-        return (prefix.upper() + "_" + "".join(map(encode, column_names)))[:max_size]
+        name = prefix.upper() + "_"
+        for column_name in column_names:
+            # hashes of columns past the size limit would be cut off
+            if len(name) >= max_size:
+                break
+            if not isinstance(column_name, bytes):
+                column_name = column_name.encode("utf-8")
+            name += "%X" % (crc32(column_name) & 0xffffffff)
+        return name[:max_size]
 
 
 class View(BaseAsset):
@@ -102,22 +132,29 @@ class View(BaseAsset):
 class Table(BaseAsset):
     def __init__(self, name, columns=None, indexes=None, foreign_keys=None, **options):
         self._set_name(name)
-        self._columns = set(columns)
-        self._indexes = set(indexes)
-        self._foreign_keys = set(foreign_keys)
+        self._columns = tuple(columns or ())
+        self._indexes = tuple(indexes or ())
+        self._foreign_keys = tuple(foreign_keys or ())
         self._options = options
+        self._column_names = None
 
     def __str__(self):
         return "'%s'" % self.get_name()
 
+    def __contains__(self, column):
+        # column names are collected on first lookup only
+        if self._column_names is None:
+            self._column_names = frozenset(x.get_name().lower() for x in self._columns)
+        return BaseAsset._get_lower_name(column) in self._column_names
+
     def get_columns(self):
-        return tuple(self._columns)
+        return self._columns
 
     def get_indexes(self):
-        return tuple(self._indexes)
+        return self._indexes
 
     def get_foreign_keys(self):
-        return tuple(self._foreign_keys)
+        return self._foreign_keys
 
     def get_options(self):
         return self._options.copy()
@@ -144,8 +181,8 @@ class Column(BaseAsset):
         self._default = default
         self._autoincrement = bool(autoincrement)
 
-        self._column_definition = str(column_definition)
-        self._comment = str(comment)
+        self._column_definition = str(column_definition) if column_definition is not None else None
+        self._comment = str(comment) if comment is not None else None
 
         self._platform_options = dict(platform_options) if platform_options else {}
         self._custom_schema_options = custom_schema_options
@@ -196,19 +233,26 @@ class Column(BaseAsset):
 class Index(BaseAsset):
     def __init__(self, name, columns, unique=False, primary=False, flags=None, **options):
         self._set_name(name)
-        self._columns = set(columns)
+        self._columns = tuple(columns)
+        self._column_names = None
 
         self._unique = unique or primary
         self._primary = primary
 
-        self._flags = set(flags or ())
+        self._flags = tuple(set(flags or ()))
         self._options = options
 
     def __str__(self):
         return "'%s' %s" % (self.get_name(), list(self._columns))
 
+    def __contains__(self, column):
+        # column names are collected on first lookup only
+        if self._column_names is None:
+            self._column_names = frozenset(x.lower() for x in self._columns)
+        return BaseAsset._get_lower_name(column) in self._column_names
+
     def get_columns(self):
-        return tuple(self._columns)
+        return self._columns
 
     def is_unique(self):
         return self._unique
@@ -217,7 +261,7 @@ class Index(BaseAsset):
         return self._primary
 
     def get_flags(self):
-        return tuple(self._flags)
+        return self._flags
 
     def get_options(self):
         return self._options.copy()
@@ -226,9 +270,9 @@ class Index(BaseAsset):
 class ForeignKey(BaseAsset):
     def __init__(self, name, local_columns, foreign_table, foreign_columns, **options):
         self._set_name(name)
-        self._local_columns = set(local_columns)
+        self._local_columns = tuple(local_columns)
         self._foreign_table = foreign_table
-        self._foreign_columns = set(foreign_columns)
+        self._foreign_columns = tuple(foreign_columns)
         self._options = options
 
     def __str__(self):
@@ -240,36 +284,50 @@ class ForeignKey(BaseAsset):
         )
 
     def get_local_columns(self):
-        return tuple(self._local_columns)
+        return self._local_columns
 
     def get_foreign_table(self):
         return self._foreign_table
 
     def get_foreign_columns(self):
-        return tuple(self._foreign_columns)
+        return self._foreign_columns
 
     def get_options(self):
         return self._options.copy()
 
 
 class SchemaManager:
+    __slots__ = ("_connection", "_platform", "_lower_names")
+
     def __init__(self, connection):
         self._connection = connection
         self._platform = connection.get_platform()
+        self._lower_names = {}
 
     def __contains__(self, item):
         if isinstance(item, (list, tuple)):
             return all(x in self for x in item)
-        try:
-            name = item.get_name().lower()
-        except AttributeError:
-            name = item.lower()
-        if isinstance(item, (Table, basestring)):
-            return name in (x.lower() for x in self.get_table_names())
+        if isinstance(item, (Table, _string_types)):
+            return BaseAsset._get_lower_name(item) in self._get_lower_table_names()
         elif isinstance(item, View):
-            return name in (x.lower() for x in self.get_view_names())
+            return BaseAsset._get_lower_name(item) in self._get_lower_view_names()
         return False
 
+    def _get_lower_table_names(self, database=None):
+        names = self.get_table_names(database)
+        return self._get_lower_names(("table", database), names, names)
+
+    def _get_lower_view_names(self, database=None):
+        views = self.get_views(database)
+        return self._get_lower_names(("view", database), views, (view.get_name() for view in views))
+
+    def _get_lower_names(self, key, source, names):
+        # lower names are kept with the cached list they were built from, and rebuilt once it is refreshed
+        entry = self._lower_names.get(key)
+        if entry is None or entry[0] is not source:
+            entry = self._lower_names[key] = source, frozenset(x.lower() for x in names)
+        return entry[1]
+
     @cached
     def get_database_names(self):
         self._connection.ensure_connected()
@@ -278,10 +336,10 @@ class SchemaManager:
     @cached
     def get_views(self, database=None):
         self._connection.ensure_connected()
-        return map(lambda x: View(*x), self._platform.get_views(database))
+        return [View(name, sql) for name, sql in self._platform.get_views(database)]
 
     def get_view_names(self, database=None, **kwargs):
-        return map(View.get_name, self.get_views(database, **kwargs))
+        return [view.get_name() for view in self.get_views(database, **kwargs)]
 
     @cached
     def get_table(self, table, database=None):
@@ -294,6 +352,23 @@ class SchemaManager:
 
         return Table(table, columns, indexes, foreign_keys)
 
+    @cached
+    def get_tables(self, database=None):
+        self._connection.ensure_connected()
+
+        # columns, indexes and foreign keys of all tables are fetched with a query each, where platform supports it
+        columns = dict(self._platform.get_all_table_columns(database))
+        indexes = dict(self._platform.get_all_table_indexes(database))
+
+        foreign_keys = {}
+        if self._platform.is_foreign_keys_supported():
+            foreign_keys = dict(self._platform.get_all_table_foreign_keys(database))
+
+        return [Table(table, SchemaManager._create_columns(columns.get(table, ())),
+                      SchemaManager._create_indexes(indexes.get(table, ())),
+                      SchemaManager._create_foreign_keys(foreign_keys.get(table, ())))
+                for table in self.get_table_names(database)]
+
     @cached
     def get_table_names(self, database=None):
         self._connection.ensure_connected()
@@ -302,35 +377,43 @@ class SchemaManager:
     @cached
     def get_table_columns(self, table, database=None):
         self._connection.ensure_connected()
+        return SchemaManager._create_columns(self._platform.get_table_columns(table, database))
 
-        def create_column(definition):
-            return Column(definition[0], BaseType.get_type(definition[1]), **definition[2])
+    @cached
+    def get_all_table_columns(self, database=None):
+        self._connection.ensure_connected()
+        return dict((table, SchemaManager._create_columns(columns))
+                    for table, columns in self._platform.get_all_table_columns(database))
 
-        return map(create_column, self._platform.get_table_columns(table, database))
+    @staticmethod
+    def _create_columns(columns):
+        get_type = BaseType.get_type
+        return [Column(name, get_type(type_), **options) for name, type_, options in columns]
 
     def get_table_column_names(self, table, database=None, **kwargs):
-        return map(Column.get_name, self.get_table_columns(table, database, **kwargs))
+        return [column.get_name() for column in self.get_table_columns(table, database, **kwargs)]
 
     @cached
     def get_table_indexes(self, table, database=None):
         self._connection.ensure_connected()
+        return SchemaManager._create_indexes(self._platform.get_table_indexes(table, database))
 
-        def create_index(definition):
-            return Index(definition[0], definition[1], **definition[2])
-
-        return map(create_index, self._platform.get_table_indexes(table, database))
+    @staticmethod
+    def _create_indexes(indexes):
+        return [Index(name, columns, **options) for name, columns, options in indexes]
 
     def get_table_index_names(self, table, database=None, **kwargs):
-        return map(Index.get_name, self.get_table_indexes(table, database, **kwargs))
+        return [index.get_name() for index in self.get_table_indexes(table, database, **kwargs)]
 
     @cached
     def get_table_foreign_keys(self, table, database=None):
         self._connection.ensure_connected()
+        return SchemaManager._create_foreign_keys(self._platform.get_table_foreign_keys(table, database))
 
-        def create_foreign_key(definition):
-            return ForeignKey(definition[0], definition[1], definition[2], definition[3], **definition[4])
-
-        return map(create_foreign_key, self._platform.get_table_foreign_keys(table, database))
+    @staticmethod
+    def _create_foreign_keys(foreign_keys):
+        return [ForeignKey(name, local_columns, foreign_table, foreign_columns, **options)
+                for name, local_columns, foreign_table, foreign_columns, options in foreign_keys]
 
     def get_table_foreign_key_names(self, table, database=None, **kwargs):
-        return map(ForeignKey.get_name, self.get_table_foreign_keys(table, database, **kwargs))
+        return [foreign_key.get_name() for foreign_key in self.get_table_foreign_keys(table, database, **kwargs)]
@@ -24,12 +24,41 @@ from __future__ import absolute_import, division, print_function, with_statement
 
 import re
 
+from operator import itemgetter
 from collections import namedtuple
 
+from pydbal.cache import LRUCache
 from pydbal.exception import DBALStatementError
 
+_get_value = itemgetter(1)
+
+
+class PreparedSQL:
+    """SQL split into literal chunks and parameter keys, which can be bound and executed without parsing."""
+
+    __slots__ = ("_sql", "_literals", "_keys")
+
+    def __init__(self, sql, literals, keys):
+        self._sql = sql
+        self._literals = literals
+        self._keys = keys
+
+    def __str__(self):
+        return self._sql
+
+    def get_sql(self):
+        return self._sql
+
+    def get_literals(self):
+        return self._literals
+
+    def get_keys(self):
+        return self._keys
+
 
 class Statement:
+    __slots__ = ("_connection", "_driver")
+
     OBJECT_NAME = "Object"
 
     FETCH_DEFAULT = 0
@@ -39,78 +68,141 @@ class Statement:
     FETCH_OBJECT = 4
     FETCH_COLUMN = 5
 
+    # namedtuple() compiles a new class, so object types are shared by results with the same columns
+    _object_types = LRUCache()
+
+    # quoted literals and comments are matched as a whole, so parameters inside them are skipped in one pass
     _re_params = re.compile(
-        r"(\?|(?<!:):[a-zA-Z_][a-zA-Z0-9_]*)(?=(?:(?:\\.|[^'\"\\])*['\"](?:\\.|[^'\"\\])*['\"])*(?:\\.|[^'\"\\])*\Z)")
+        r"'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|`[^`]*`|--[^\n]*|/\*.*?\*/"
+        r"|(\?|(?<!:):[a-zA-Z_][a-zA-Z0-9_]*)", re.DOTALL)
 
     def __init__(self, connection):
         self._connection = connection
+        self._driver = connection.get_driver()
 
     def __iter__(self):
         return self.iterate()
 
     def clear(self):
-        self._connection.get_driver().clear()
+        self._driver.clear()
 
     def iterate(self, fetch_mode=None, column_index=0):
         if fetch_mode is None:
             fetch_mode = self._connection.get_fetch_mode()
 
-        for row in self._connection.get_driver().iterate():
-            yield self._transform(row, fetch_mode, column_index)
+        # fetch mode is resolved once per result, not for every row
+        rows = self._iterate_rows()
+        if fetch_mode == Statement.FETCH_DICT:
+            return (dict(row) for row in rows)
+        elif fetch_mode == Statement.FETCH_COLUMN:
+            return (row[column_index][1] for row in rows)
+        elif fetch_mode == Statement.FETCH_TUPLE:
+            return (tuple(map(_get_value, row)) for row in rows)
+        elif fetch_mode == Statement.FETCH_LIST:
+            return (list(map(_get_value, row)) for row in rows)
+        elif fetch_mode == Statement.FETCH_OBJECT:
+            return Statement._iterate_objects(rows)
+        return rows
+
+    def _iterate_rows(self):
+        return self._driver.iterate()
+
+    def _fetch_rows(self):
+        return self._driver.fetchall()
 
     @staticmethod
-    def _transform(row, fetch_mode=FETCH_DEFAULT, column_index=0):
-        if fetch_mode == Statement.FETCH_DICT:
-            return dict(row)
+    def _iterate_objects(rows):
+        make = None
+        for row in rows:
+            if make is None:
+                # all rows of the result share the same columns
+                make = Statement._get_object_type(tuple(x[0] for x in row))._make
+            yield make(map(_get_value, row))
 
-        if fetch_mode == Statement.FETCH_COLUMN:
-            return row[column_index][1]
+    @staticmethod
+    def _get_object_type(columns):
+        try:
+            return Statement._object_types[columns]
+        except KeyError:
+            object_type = Statement._object_types[columns] = namedtuple(Statement.OBJECT_NAME, columns)
+            return object_type
 
-        values = tuple(x[1] for x in row)
-        if fetch_mode == Statement.FETCH_TUPLE:
-            return values
-        elif fetch_mode == Statement.FETCH_LIST:
-            return list(values)
-        elif fetch_mode == Statement.FETCH_OBJECT:
-            return namedtuple(Statement.OBJECT_NAME, [x[0] for x in row])._make(values)
+    @staticmethod
+    def prepare(sql):
+        """Splits SQL into literal chunks and parameter keys, so it can be bound without parsing it again.
 
-        return row
+        :param sql: SQL to prepare
+        :return: prepared SQL
+        :rtype: PreparedSQL
+        """
+        # SQL without parameter markers is not scanned at all
+        if "?" not in sql and ":" not in sql:
+            return PreparedSQL(sql, (sql, ), ())
+
+        literals, keys = [], []
+        position = param_counter = 0
+        for match in Statement._re_params.finditer(sql):
+            token = match.group(1)
+            if token is None:
+                continue
+            literals.append(sql[position:match.start()])
+            position = match.end()
+            if token == "?":
+                keys.append(param_counter)
+                param_counter += 1
+            else:
+                keys.append(token[1:])
+        literals.append(sql[position:])
+        return PreparedSQL(sql, tuple(literals), tuple(keys))
 
     def execute(self, sql, *args, **kwargs):
+        if not isinstance(sql, PreparedSQL):
+            sql = Statement.prepare(sql)
+
+        driver = self._driver
+        keys = sql.get_keys()
+        if not keys:
+            return driver.execute(sql.get_sql())
+
         for i, arg in enumerate(args):
             kwargs[i] = arg
-        params = []
-        sql = Statement._re_params.sub(self._prepare(kwargs, params), sql)
-        return self._connection.get_driver().execute(sql, *params)
-
-    def _prepare(self, params, exec_params):
-        def replace(match):
-            key = match.group()
-            if key == "?":
-                key = replace._param_counter
-                replace._param_counter += 1
-            else:
-                key = key.lstrip(":")
 
-            if key not in params:
+        placeholder = driver.get_placeholder()
+        literals = sql.get_literals()
+        sql, params = [literals[0]], []
+        for key, literal in zip(keys, literals[1:]):
+            if key not in kwargs:
                 if isinstance(key, int):
-                    raise DBALStatementError.missing_positional_parameter(key, params)
+                    raise DBALStatementError.missing_positional_parameter(key, kwargs)
                 else:
-                    raise DBALStatementError.missing_named_parameter(key, params)
-
-            param = params[key]
+                    raise DBALStatementError.missing_named_parameter(key, kwargs)
 
+            param = kwargs[key]
             if isinstance(param, (list, tuple)):
-                exec_params.extend(param)
-                return ", ".join((replace._placeholder, ) * len(param))
+                params.extend(param)
+                sql.append(", ".join((placeholder, ) * len(param)))
+            else:
+                params.append(param)
+                sql.append(placeholder)
+            sql.append(literal)
+
+        return driver.execute("".join(sql), *params)
 
-            exec_params.append(param)
-            return replace._placeholder
+    def execute_many(self, sql, params):
+        """Executes SQL once for every row of parameters in a single driver batch.
 
-        replace._placeholder = self._connection.get_driver().get_placeholder()
-        replace._param_counter = 0
+        :param sql: SQL or prepared SQL to execute
+        :param params: iterable of parameter rows (sequences for positional or dicts for named parameters)
+        :return: number of affected rows
+        :rtype: int
+        """
+        if not isinstance(sql, PreparedSQL):
+            sql = Statement.prepare(sql)
 
-        return replace
+        driver = self._driver
+        keys = sql.get_keys()
+        sql = driver.get_placeholder().join(sql.get_literals())
+        return driver.execute_many(sql, [tuple(row[key] for key in keys) for row in params])
 
     def fetch(self, fetch_mode=None):
         try:
@@ -119,10 +211,46 @@ class Statement:
             return None
 
     def fetch_all(self, fetch_mode=None, column_index=0):
-        return list(self.iterate(fetch_mode, column_index))
+        if fetch_mode is None:
+            fetch_mode = self._connection.get_fetch_mode()
+
+        # rows are read at once and converted by a list comprehension, without a generator per row
+        rows = self._fetch_rows()
+        if fetch_mode == Statement.FETCH_DICT:
+            return [dict(row) for row in rows]
+        elif fetch_mode == Statement.FETCH_COLUMN:
+            return [row[column_index][1] for row in rows]
+        elif fetch_mode == Statement.FETCH_TUPLE:
+            return [tuple(map(_get_value, row)) for row in rows]
+        elif fetch_mode == Statement.FETCH_LIST:
+            return [list(map(_get_value, row)) for row in rows]
+        elif fetch_mode == Statement.FETCH_OBJECT:
+            return list(Statement._iterate_objects(rows))
+        return rows
 
     def fetch_column(self, column_index=0):
         try:
             return next(self.iterate(Statement.FETCH_COLUMN, column_index))
         except StopIteration:
             return None
+
+
+class BufferedStatement(Statement):
+    """Result set read into memory, e.g. from the query cache."""
+
+    __slots__ = ("_rows", )
+
+    def __init__(self, connection, rows):
+        Statement.__init__(self, connection)
+        self._rows = iter(rows)
+
+    def clear(self):
+        self._rows = iter(())
+
+    def _iterate_rows(self):
+        return self._rows
+
+    def _fetch_rows(self):
+        rows = list(self._rows)
+        self.clear()
+        return rows
@@ -22,16 +22,14 @@
 
 from __future__ import absolute_import, division, print_function, with_statement
 
-import time
-
-from threading import RLock
+from threading import Condition
+from collections import deque
 from contextlib import contextmanager
 from pydbal.connection import Connection as UnsafeConnection
 
 
 class SafeConnection:
     POOL_MAX_SIZE = 4
-    LOCK = RLock()
 
     def __init__(self, *args, **kwargs):
         """Initialises thread-safe database connection.
@@ -41,35 +39,30 @@ class SafeConnection:
         self._args = args
         self._kwargs = kwargs
 
-        self._pool = {}
+        self._pool_free = deque()
         self._pool_size = 0
         self._pool_max_size = kwargs.pop("_pool_max_size", SafeConnection.POOL_MAX_SIZE)
+        self._pool_condition = Condition()
 
         assert self._pool_max_size > 0
 
     def _get_connection(self):
-        with SafeConnection.LOCK:
-            for conn, locked in self._pool.iteritems():
-                if not locked:
+        with self._pool_condition:
+            # connection is taken off the free list before the condition is released
+            while not self._pool_free:
+                if self._pool_size < self._pool_max_size:
+                    conn = UnsafeConnection(*self._args, **self._kwargs)
+                    self._pool_size += 1
                     return conn
 
-            if self._pool_size == self._pool_max_size:
-                while True:
-                    time.sleep(1)
-                    for conn, locked in self._pool.iteritems():
-                        if not locked:
-                            return conn
-
-            conn = UnsafeConnection(*self._args, **self._kwargs)
-            self._pool[conn] = False
-            self._pool_size += 1
-            return conn
-
-    def _lock(self, conn):
-        self._pool[conn] = True
+                # waiting thread is woken up by _unlock() as soon as a connection is returned
+                self._pool_condition.wait()
+            return self._pool_free.pop()
 
     def _unlock(self, conn):
-        self._pool[conn] = False
+        with self._pool_condition:
+            self._pool_free.append(conn)
+            self._pool_condition.notify()
 
     @contextmanager
     def locked(self):
@@ -80,7 +73,6 @@ class SafeConnection:
         """
         conn = self._get_connection()
         try:
-            self._lock(conn)
             yield conn
         finally:
             self._unlock(conn)
@@ -110,6 +102,25 @@ class SafeConnection:
         with self.locked() as conn:
             return conn.execute(sql, *args, **kwargs)
 
+    def execute_many(self, sql, params):
+        """Executes an SQL INSERT/UPDATE/DELETE query once for every row of parameters in a single driver batch.
+
+        :param sql: statement to execute
+        :param params: iterable of parameter rows (sequences for positional or dicts for named parameters)
+        :return: number of affected rows
+        :rtype: int
+        """
+        with self.locked() as conn:
+            return conn.execute_many(sql, params)
+
+    def execute_script(self, statements):
+        """Executes SQL statements without parameters as a single script.
+
+        :param statements: iterable of SQL statements
+        """
+        with self.locked() as conn:
+            conn.execute_script(statements)
+
     def fetch(self, sql, *args, **kwargs):
         """Executes an SQL SELECT query and returns the first row or `None`.
 
@@ -168,6 +179,18 @@ class SafeConnection:
         with self.locked() as conn:
             return conn.insert(table, values)
 
+    def insert_many(self, table, rows, batch_size=1000):
+        """Inserts multiple table rows with specified data in batches per set of columns.
+
+        :param table: the expression of the table to insert data into, quoted or unquoted
+        :param rows: an iterable of dictionaries containing column-value pairs
+        :param batch_size: maximum number of rows sent to the driver at once
+        :return: the number of affected rows
+        :rtype: int
+        """
+        with self.locked() as conn:
+            return conn.insert_many(table, rows, batch_size)
+
     def update(self, table, values, identifier):
         """Updates a table row with specified data by given identifier.
 
@@ -51,9 +51,10 @@ class BaseType:
 
     @staticmethod
     def get_type(name):
-        if name not in BaseType.TYPES:
+        try:
+            return BaseType.TYPES[name]
+        except KeyError:
             raise DBALTypesError.unknown_type(name)
-        return BaseType.TYPES[name]
 
     @staticmethod
     @abstractmethod
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import unittest
+
+from pydbal.connection import Connection
+
+
+class SQLBuilderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = Connection("sqlite", database=":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_values_mutated_after_add(self):
+        sb = self.conn.sql_builder().insert("t")
+        values = {"a": "?"}
+        sb.values(values)
+        self.assertEqual(sb.get_sql(), "INSERT INTO t (a) VALUES(?)")
+
+        values["b"] = "?"
+        sb.values(values)
+        self.assertIn(sb.get_sql(), ("INSERT INTO t (a, b) VALUES(?, ?)", "INSERT INTO t (b, a) VALUES(?, ?)"))
+
+    def test_values_are_copied(self):
+        values = {"a": "?"}
+        sb = self.conn.sql_builder().insert("t").values(values)
+        sb.set_value("b", "?")
+        sb.values({"c": "?"})
+        self.assertEqual(values, {"a": "?"})
+        self.assertEqual(sb.get_sql(), "INSERT INTO t (c) VALUES(?)")
+
+    def test_unchanged_values_keep_sql(self):
+        sb = self.conn.sql_builder().insert("t").values({"a": "?"})
+        sql = sb.get_sql()
+        sb.values({"a": "?"})
+        self.assertIs(sb.get_sql(), sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import time
+import unittest
+
+from pydbal.connection import Connection
+from pydbal.drivers.sqlite import SQLiteDriver
+from pydbal.exception import DBALDriverError
+
+
+class RecordingSQLiteDriver(SQLiteDriver):
+    """SQLite driver recording the size of every batch sent to `execute_many`."""
+
+    def __init__(self, *args, **kwargs):
+        SQLiteDriver.__init__(self, *args, **kwargs)
+        self.batches = []
+
+    def execute_many(self, sql, params):
+        self.batches.append(len(params))
+        return SQLiteDriver.execute_many(self, sql, params)
+
+
+def _connect(**params):
+    driver = RecordingSQLiteDriver(":memory:", logger=None, auto_commit=True)
+    return Connection(driver, **params)
+
+
+class InsertManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = _connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, a INTEGER NOT NULL, b TEXT)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _fetch_rows(self):
+        return self.conn.query("SELECT id, a, b FROM t ORDER BY id").fetch_all(Connection.FETCH_TUPLE)
+
+    def test_mixed_columns_keep_order(self):
+        rows = [{"a": 1, "b": "x"}, {"a": 2}, {"b": "z", "a": 3}, {"a": 4, "b": "w"}, {"a": 5}]
+        self.assertEqual(self.conn.insert_many("t", rows), 5)
+        self.assertEqual(self._fetch_rows(), [(1, 1, "x"), (2, 2, None), (3, 3, "z"), (4, 4, "w"), (5, 5, None)])
+        # consecutive rows with the same columns share a batch, whatever the order of keys
+        self.assertEqual(self.conn.get_driver().batches, [1, 1, 2, 1])
+
+    def test_batch_size(self):
+        rows = [{"a": i} for i in range(7)]
+        self.assertEqual(self.conn.insert_many("t", rows, batch_size=3), 7)
+        self.assertEqual(self.conn.get_driver().batches, [3, 3, 1])
+        self.assertEqual([row[1] for row in self._fetch_rows()], list(range(7)))
+
+    def test_batch_size_exact_multiple(self):
+        self.assertEqual(self.conn.insert_many("t", [{"a": i} for i in range(6)], batch_size=3), 6)
+        self.assertEqual(self.conn.get_driver().batches, [3, 3])
+
+    def test_empty_rows(self):
+        self.assertEqual(self.conn.insert_many("t", []), 0)
+        self.assertEqual(self.conn.get_driver().batches, [])
+
+    def test_rollback_on_failure(self):
+        rows = [{"a": 1}, {"a": 2}, {"a": None}]
+        self.assertRaises(DBALDriverError, self.conn.insert_many, "t", rows, batch_size=2)
+        self.assertEqual(self._fetch_rows(), [])
+        self.assertFalse(self.conn.is_transaction_active())
+
+
+class ExecuteManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = _connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, a INTEGER NOT NULL)")
+        self.conn.insert_many("t", [{"a": i % 3} for i in range(6)])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_row_count_is_summed(self):
+        # every parameter row updates two table rows
+        self.assertEqual(self.conn.execute_many("UPDATE t SET a = ? WHERE a = ?", [(10, 0), (11, 1)]), 4)
+        self.assertEqual(self.conn.execute_many("DELETE FROM t WHERE a = ?", [(2, ), (3, )]), 2)
+        self.assertEqual(self.conn.get_driver().batches[-2:], [2, 2])
+
+    def test_named_parameters(self):
+        sql = "UPDATE t SET a = :value WHERE id = :id"
+        self.assertEqual(self.conn.execute_many(sql, [{"id": 1, "value": 7}, {"value": 8, "id": 2}]), 2)
+        self.assertEqual(self.conn.query("SELECT SUM(a) FROM t WHERE id <= 2").fetch_column(), 15)
+
+    def test_failure(self):
+        self.assertRaises(DBALDriverError, self.conn.execute_many, "INSERT INTO t VALUES (?, ?)", [(7, 1), (1, 1)])
+
+
+class PrepareTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = _connect(max_prepared=2)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_cache_hit(self):
+        prepared = self.conn.prepare("SELECT ?")
+        self.assertIs(self.conn.prepare("SELECT ?"), prepared)
+        self.assertIs(self.conn.prepare(prepared), prepared)
+        self.assertEqual(self.conn.query(prepared, 1).fetch_column(), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        first, second = self.conn.prepare("SELECT 1"), self.conn.prepare("SELECT 2")
+        self.assertIs(self.conn.prepare("SELECT 1"), first)  # hit makes "SELECT 2" the oldest
+        self.conn.prepare("SELECT 3")
+        self.assertIs(self.conn.prepare("SELECT 1"), first)
+        self.assertIsNot(self.conn.prepare("SELECT 2"), second)
+
+    def test_disabled(self):
+        conn = _connect(max_prepared=0)
+        self.assertIsNot(conn.prepare("SELECT 1"), conn.prepare("SELECT 1"))
+        self.assertEqual(conn.query("SELECT ?", 1).fetch_column(), 1)
+        conn.close()
+
+    def test_set_max_prepared(self):
+        first = self.conn.prepare("SELECT 1")
+        self.conn.prepare("SELECT 2")
+        self.conn.set_max_prepared(1)
+        self.assertEqual(self.conn.get_max_prepared(), 1)
+        self.assertIsNot(self.conn.prepare("SELECT 1"), first)
+
+        self.conn.set_max_prepared(0)
+        self.assertIsNot(self.conn.prepare("SELECT 1"), self.conn.prepare("SELECT 1"))
+
+
+class QueryCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = _connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER)")
+        self.conn.set_query_cache()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _count(self):
+        return self.conn.query("SELECT COUNT(*) FROM t").fetch_column()
+
+    def _write_uncached(self):
+        # driver writes bypass the connection, so results cached before them are stale
+        self.conn.get_driver().execute_and_clear("INSERT INTO t VALUES (0)")
+
+    def test_hit(self):
+        self.assertEqual(self._count(), 0)
+        self._write_uncached()
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(self.conn.query("SELECT COUNT(*) FROM t WHERE id = ?", 0).fetch_column(), 1)
+
+    def test_ttl_expiry(self):
+        self.conn.set_query_cache(ttl=0.05)
+        self.assertEqual(self._count(), 0)
+        self._write_uncached()
+        self.assertEqual(self._count(), 0)
+        time.sleep(0.1)
+        self.assertEqual(self._count(), 1)
+
+    def test_disabled(self):
+        self.conn.set_query_cache(0)
+        self.assertEqual(self._count(), 0)
+        self._write_uncached()
+        self.assertEqual(self._count(), 1)
+
+    def _assert_invalidated_by(self, write, count):
+        self.assertEqual(self._count(), 0)
+        self._write_uncached()
+        write()
+        self.assertEqual(self._count(), count)
+
+    def test_invalidated_by_execute(self):
+        self._assert_invalidated_by(lambda: self.conn.execute("INSERT INTO t VALUES (?)", 1), 2)
+
+    def test_invalidated_by_execute_many(self):
+        self._assert_invalidated_by(lambda: self.conn.execute_many("INSERT INTO t VALUES (?)", [(1, ), (2, )]), 3)
+
+    def test_invalidated_by_insert_many(self):
+        self._assert_invalidated_by(lambda: self.conn.insert_many("t", [{"id": 1}]), 2)
+
+    def test_invalidated_by_non_select_query(self):
+        self._assert_invalidated_by(lambda: self.conn.query("INSERT INTO t VALUES (?)", 1), 2)
+
+    def test_invalidated_by_execute_script(self):
+        self._assert_invalidated_by(lambda: self.conn.execute_script(["INSERT INTO t VALUES (1)"]), 2)
+
+    def test_bypassed_in_transaction(self):
+        self.assertEqual(self._count(), 0)
+        self._write_uncached()
+        self.conn.begin_transaction()
+        self.assertEqual(self._count(), 1)
+        self._write_uncached()
+        self.assertEqual(self._count(), 2)
+        self.conn.commit()
+        # results read inside the transaction are not cached, the one from before it still is
+        self.assertEqual(self._count(), 0)
+
+
+class ExecuteScriptTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = _connect()
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _ids(self):
+        return self.conn.query("SELECT id FROM t ORDER BY id").fetch_all(Connection.FETCH_COLUMN)
+
+    def test_outside_transaction(self):
+        self.conn.execute_script(["INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (2)"])
+        self.assertEqual(self._ids(), [1, 2])
+
+    def test_outside_transaction_keeps_statements_before_failure(self):
+        script = ["INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (2)"]
+        self.assertRaises(DBALDriverError, self.conn.execute_script, script)
+        self.assertEqual(self._ids(), [1])
+
+    def test_inside_transaction(self):
+        self.conn.begin_transaction()
+        self.conn.execute_script(["INSERT INTO t VALUES (1)", "INSERT INTO t VALUES (2)"])
+        self.assertEqual(self._ids(), [1, 2])
+        self.conn.rollback()
+        # script did not commit the transaction it ran in
+        self.assertEqual(self._ids(), [])
+
+    def test_failure_rolls_back_to_savepoint(self):
+        self.conn.begin_transaction()
+        self.conn.execute("INSERT INTO t VALUES (1)")
+        script = ["INSERT INTO t VALUES (2)", "INSERT INTO t VALUES (1)"]
+        self.assertRaises(DBALDriverError, self.conn.execute_script, script)
+        self.assertTrue(self.conn.is_transaction_active())
+        self.assertEqual(self._ids(), [1])
+        self.conn.execute_script(["INSERT INTO t VALUES (3)"])
+        self.conn.commit()
+        self.assertEqual(self._ids(), [1, 3])
+
+    def test_empty_script(self):
+        self.conn.execute_script([])
+        self.assertEqual(self._ids(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
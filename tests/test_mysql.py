@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import sys
+import types
+import unittest
+
+try:
+    import MySQLdb  # noqa: F401
+except ImportError:
+    # driver talks to the fake connection below, only its module level names are needed
+    MySQLdb = types.ModuleType("MySQLdb")
+    MySQLdb.DatabaseError = type("DatabaseError", (Exception, ), {})
+    MySQLdb.OperationalError = type("OperationalError", (MySQLdb.DatabaseError, ), {})
+    MySQLdb.cursors = types.ModuleType("MySQLdb.cursors")
+    MySQLdb.cursors.Cursor = MySQLdb.cursors.SSCursor = object
+    sys.modules["MySQLdb"] = MySQLdb
+    sys.modules["MySQLdb.cursors"] = MySQLdb.cursors
+
+from pydbal.connection import Connection
+from pydbal.drivers.mysql import MySQLDriver
+from pydbal.exception import DBALDriverError
+
+
+class FakeCursor(object):
+    """Buffered cursor returning result sets configured on its connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.executed = []
+        self.nextset_calls = 0
+        self._rows = []
+        self._pending = []
+
+    def _set_result(self, rows):
+        if isinstance(rows, Exception):
+            # e.g. failing statement of a multi-statement query, reported when its result is reached
+            self.description, self._rows, self._pending = None, [], []
+            raise rows
+        self.description = None if rows is None else (("id", ), )
+        self._rows = list(rows or ())
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        results = list(self.conn.results.get(sql, [None]))
+        self._pending = results[1:]
+        self._set_result(results[0])
+        return len(self._rows)
+
+    def executemany(self, sql, params):
+        self.executed.append((sql, params))
+        self._set_result(None)
+        return len(params)
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def nextset(self):
+        self.nextset_calls += 1
+        if not self._pending:
+            return None
+        self._set_result(self._pending.pop(0))
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeConnection(object):
+    def __init__(self, results):
+        self.results = results
+        self.cursors = []
+
+    def errno(self):
+        return 0
+
+    def error(self):
+        return ""
+
+    def cursor(self):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        pass
+
+
+class MySQLDriverCursorTestCase(unittest.TestCase):
+    ROW_COUNT = MySQLDriver.FETCH_SIZE * 2 + 5
+
+    def setUp(self):
+        self.conn = FakeConnection({
+            "SELECT all": [[(i, ) for i in range(self.ROW_COUNT)]],
+            "SELECT two": [[(1, ), (2, )]],
+            "SELECT last": [[(self.ROW_COUNT, )]],
+            "CALL multi": [[(1, )], [(2, )], None],
+        })
+        self.driver = MySQLDriver("localhost", logger=None, auto_commit=True)
+        self.driver._conn = self.conn
+
+    def test_cursor_reused(self):
+        self.driver.execute("UPDATE t")
+        self.driver.execute("SELECT two")
+        self.assertEqual(self.driver.fetchall(), [(("id", 1), ), (("id", 2), )])
+        self.driver.execute("SELECT two")
+        self.assertEqual(len(list(self.driver.iterate())), 2)
+        self.driver.execute_many("INSERT t", [(1, ), (2, )])
+        self.driver.execute("UPDATE t")
+        self.assertEqual(len(self.conn.cursors), 1)
+
+    def test_execute_while_iterating(self):
+        self.driver.execute("SELECT all")
+        visited = 0
+        for _ in self.driver.iterate():
+            self.driver.execute("UPDATE t")
+            visited += 1
+            self.assertLessEqual(visited, self.ROW_COUNT)
+        self.assertEqual(visited, self.ROW_COUNT)
+        self.assertEqual(len(self.conn.cursors), 2)
+
+    def test_query_while_iterating(self):
+        self.driver.execute("SELECT two")
+        for i, _ in enumerate(self.driver.iterate()):
+            self.assertLess(i, 2)
+            self.driver.execute("SELECT last")
+        # result of the inner statement is not cleared when the outer iteration ends
+        self.assertEqual(self.driver.fetchall(), [(("id", self.ROW_COUNT), )])
+
+    def test_clear_drains_result_sets(self):
+        self.driver.execute("CALL multi")
+        cursor = self.conn.cursors[0]
+        self.driver.clear()
+        self.assertEqual(cursor.nextset_calls, 3)
+
+        # cleared cursor is reused and not drained again
+        self.driver.execute("UPDATE t")
+        self.driver.clear()
+        self.driver.clear()
+        self.assertEqual(self.conn.cursors, [cursor])
+        self.assertEqual(cursor.nextset_calls, 4)
+
+    def test_iterate_drains_result_sets(self):
+        self.driver.execute("CALL multi")
+        self.assertEqual(list(self.driver.iterate()), [(("id", 1), )])
+        self.assertEqual(self.conn.cursors[0].nextset_calls, 3)
+
+
+class MySQLExecuteScriptTestCase(unittest.TestCase):
+    SCRIPT = ["UPDATE a", "UPDATE b"]
+
+    def setUp(self):
+        self.conn = FakeConnection({})
+        driver = MySQLDriver("localhost", logger=None, auto_commit=True)
+        driver._conn = self.conn
+        self.connection = Connection(driver, auto_connect=False)
+
+    def _executed(self):
+        return [sql for cursor in self.conn.cursors for sql, _ in cursor.executed]
+
+    def test_single_round_trip(self):
+        self.connection.execute_script(self.SCRIPT)
+        self.assertEqual(self._executed(), ["UPDATE a;\nUPDATE b"])
+
+    def test_inside_transaction(self):
+        self.connection.begin_transaction()
+        self.connection.execute_script(self.SCRIPT)
+        self.assertEqual(self._executed(), [
+            "START TRANSACTION",
+            "SAVEPOINT PYDBAL_SCRIPT;\nUPDATE a;\nUPDATE b;\nRELEASE SAVEPOINT PYDBAL_SCRIPT"
+        ])
+
+    def test_failure_rolls_back_to_savepoint(self):
+        script = "SAVEPOINT PYDBAL_SCRIPT;\nUPDATE a;\nUPDATE b;\nRELEASE SAVEPOINT PYDBAL_SCRIPT"
+        self.conn.results[script] = [None, None, MySQLdb.OperationalError("failed"), None]
+        self.connection.begin_transaction()
+        self.assertRaises(DBALDriverError, self.connection.execute_script, self.SCRIPT)
+        self.assertEqual(self._executed(), ["START TRANSACTION", script, "ROLLBACK TO SAVEPOINT PYDBAL_SCRIPT"])
+        self.assertTrue(self.connection.is_transaction_active())
+
+
+if __name__ == "__main__":
+    unittest.main()
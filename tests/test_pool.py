@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import time
+import threading
+import unittest
+
+from pydbal.exception import DBALConnectionError
+from pydbal.pool import ConnectionPool
+
+
+class CountingConnectionPool(ConnectionPool):
+    """Pool counting connections it opens."""
+
+    def __init__(self, *args, **kwargs):
+        self.opened = 0
+        ConnectionPool.__init__(self, *args, **kwargs)
+
+    def _create_connection(self):
+        self.opened += 1
+        return ConnectionPool._create_connection(self)
+
+
+def _create_pool(**kwargs):
+    return CountingConnectionPool("sqlite", database=":memory:", **kwargs)
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def test_release_reuses_connection(self):
+        pool = _create_pool()
+        conn = pool.acquire()
+        self.assertIs(conn.get_pool(), pool)
+        conn.release()
+        self.assertIs(pool.acquire(), conn)
+        self.assertEqual(pool.opened, 1)
+        pool.close()
+
+    def test_min_size_prefill(self):
+        pool = _create_pool(min_size=2, max_size=3)
+        self.assertEqual(pool.opened, 2)
+        first, second = pool.acquire(), pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_connected() and second.is_connected())
+        self.assertEqual(pool.opened, 2)
+        pool.acquire()
+        self.assertEqual(pool.opened, 3)
+        pool.close()
+
+    def test_release_rolls_back(self):
+        pool = _create_pool()
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (id INTEGER)")
+            conn.begin_transaction()
+            conn.begin_transaction()
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        conn = pool.acquire()
+        self.assertFalse(conn.is_transaction_active())
+        self.assertEqual(conn.query("SELECT COUNT(*) FROM t").fetch_column(), 0)
+        pool.close()
+
+    def test_idle_timeout(self):
+        pool = _create_pool(min_size=2, idle_timeout=0.05)
+        time.sleep(0.1)
+        conn = pool.acquire()
+        self.assertEqual(pool.opened, 3)
+        conn.release()
+        self.assertIs(pool.acquire(), conn)
+        pool.close()
+
+    def test_max_size_timeout(self):
+        pool = _create_pool(max_size=1)
+        conn = pool.acquire()
+        self.assertRaises(DBALConnectionError, pool.acquire, 0.05)
+        conn.release()
+        self.assertIs(pool.acquire(0), conn)
+        self.assertEqual(pool.opened, 1)
+        pool.close()
+
+    def test_max_size_waits_for_release(self):
+        pool = _create_pool(max_size=1)
+        conn = pool.acquire()
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire(5)))
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(acquired, [])
+        conn.release()
+        thread.join(5)
+        self.assertEqual(acquired, [conn])
+        self.assertEqual(pool.opened, 1)
+        pool.close()
+
+    def test_failed_rollback_frees_slot(self):
+        pool = _create_pool(max_size=1)
+        conn = pool.acquire()
+        conn.begin_transaction()
+        conn.get_driver().close()  # rollback fails on closed connection
+        self.assertRaises(Exception, conn.release)
+        self.assertIsNot(pool.acquire(0), conn)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import sqlite3
+import unittest
+
+from pydbal.connection import Connection
+from pydbal.schema import View
+
+
+class BatchIntrospectionTestCase(unittest.TestCase):
+    SCRIPT = [
+        "CREATE TABLE parent (id INTEGER PRIMARY KEY, \"a,b\" DECIMAL(10,2) DEFAULT 1 NOT NULL -- amount\n, c TEXT)",
+        "CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER REFERENCES parent (id) ON DELETE CASCADE, "
+        "name VARCHAR(20) COLLATE NOCASE UNIQUE)",
+        "CREATE INDEX child_parent ON child (parent_id)",
+        "CREATE TABLE empty (v BLOB)",
+        "CREATE TEMP TABLE tmp (v TEXT NOT NULL)",
+    ]
+
+    def setUp(self):
+        self.conn = Connection("sqlite", database=":memory:")
+        self.conn.execute_script(self.SCRIPT)
+        self.platform = self.conn.get_platform()
+
+    def tearDown(self):
+        self.conn.close()
+        Connection.cache_clear()
+
+    def _get_per_table(self, getter):
+        return [(table, list(getter(table))) for table in self.platform.get_tables()]
+
+    def _assert_columns_match(self):
+        columns = list(self.platform.get_all_table_columns())
+        self.assertEqual([table for table, _ in columns], ["child", "empty", "parent", "tmp"])
+        self.assertEqual(columns, self._get_per_table(self.platform.get_table_columns))
+
+    @unittest.skipIf(sqlite3.sqlite_version_info < (3, 16), "table-valued PRAGMA functions are not available")
+    def test_columns(self):
+        self._assert_columns_match()
+
+    def test_columns_without_pragma_functions(self):
+        self.conn.get_driver()._server_version_info = (3, 15, 0)
+        self._assert_columns_match()
+
+    def test_indexes(self):
+        self.assertEqual(list(self.platform.get_all_table_indexes()),
+                         self._get_per_table(self.platform.get_table_indexes))
+
+    def test_foreign_keys(self):
+        self.assertEqual(list(self.platform.get_all_table_foreign_keys()),
+                         self._get_per_table(self.platform.get_table_foreign_keys))
+
+    @staticmethod
+    def _describe(table):
+        return (
+            table.get_name(),
+            [(str(x), x.get_default(), x.get_comment(), x.get_precision(), x.get_scale()) for x in table.get_columns()],
+            [(str(x), x.get_options()) for x in table.get_indexes()],
+            [(str(x), x.get_options()) for x in table.get_foreign_keys()],
+        )
+
+    def test_schema_manager_tables(self):
+        sm = self.conn.get_schema_manager()
+        tables = [self._describe(table) for table in sm.get_tables()]
+        self.assertEqual(tables, [self._describe(sm.get_table(name)) for name in sm.get_table_names()])
+
+    def test_schema_manager_all_table_columns(self):
+        sm = self.conn.get_schema_manager()
+        columns = dict((table, [str(x) for x in table_columns])
+                       for table, table_columns in sm.get_all_table_columns().items())
+        self.assertEqual(columns, dict((table, [str(x) for x in sm.get_table_columns(table)])
+                                       for table in sm.get_table_names()))
+
+
+class ContainsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = Connection("sqlite", database=":memory:")
+        self.conn.execute("CREATE TABLE Parent (id INTEGER)")
+        self.sm = self.conn.get_schema_manager()
+
+    def tearDown(self):
+        self.conn.close()
+        Connection.cache_clear()
+
+    def test_tables(self):
+        self.assertIn("parent", self.sm)
+        self.assertIn(["PARENT", "Parent"], self.sm)
+        self.assertNotIn("child", self.sm)
+        self.assertNotIn(["parent", "child"], self.sm)
+
+    def test_table_names_refreshed(self):
+        self.assertNotIn("child", self.sm)
+        self.conn.execute("CREATE TABLE child (id INTEGER)")
+        self.sm.get_table_names(_cache=False)
+        self.assertIn("Child", self.sm)
+        self.conn.execute("DROP TABLE child")
+        Connection.cache_clear()
+        self.assertNotIn("child", self.sm)
+
+    def test_views_refreshed(self):
+        view = View("v", "CREATE VIEW v AS SELECT id FROM Parent")
+        self.assertNotIn(view, self.sm)
+        self.conn.execute(view.get_sql())
+        self.sm.get_views(_cache=False)
+        self.assertIn(View("V", ""), self.sm)
+
+
+if __name__ == "__main__":
+    unittest.main()
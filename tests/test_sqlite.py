@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2016 Alexander Lokhman <alex.lokhman@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from __future__ import absolute_import, division, print_function, with_statement
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pydbal.connection import Connection
+from pydbal.drivers.sqlite import SQLiteDriver
+from pydbal.platforms.sqlite import SQLitePlatform
+from pydbal.exception import DBALDriverError
+
+
+class IterateWhileExecuteTestCase(unittest.TestCase):
+    ROW_COUNT = SQLiteDriver.FETCH_SIZE * 2 + 500
+
+    def setUp(self):
+        self.conn = Connection("sqlite", database=":memory:")
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)")
+        self.conn.insert_many("t", [{"v": 0}] * self.ROW_COUNT)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_execute_while_iterating(self):
+        visited = 0
+        for row in self.conn.query("SELECT id FROM t"):
+            self.conn.execute("UPDATE t SET v = 1 WHERE id = ?", row["id"])
+            visited += 1
+        self.assertEqual(visited, self.ROW_COUNT)
+        self.assertEqual(self.conn.query("SELECT COUNT(*) FROM t WHERE v = 1").fetch_column(), self.ROW_COUNT)
+
+    def test_query_while_iterating(self):
+        inner = None
+        for i, _ in enumerate(self.conn.query("SELECT id FROM t WHERE id <= 2")):
+            self.assertLess(i, 2)
+            inner = self.conn.query("SELECT id FROM t WHERE id > ?", self.ROW_COUNT - 2)
+        self.assertEqual([row["id"] for row in inner], [self.ROW_COUNT - 1, self.ROW_COUNT])
+
+
+class ColumnDefinitionsTestCase(unittest.TestCase):
+    CASES = [
+        ("CREATE TABLE t(a, b)", {"a": ("a", []), "b": ("b", [])}),
+        # quoted names may contain separators, parentheses and escaped quotes
+        ('CREATE TABLE "t,(" ("a,b" INT, [c(d] TEXT, `e``f` BLOB, "g""h" REAL, \'i)\' INT)', {
+            "a,b": ('"a,b" INT', []),
+            "c(d": ("[c(d] TEXT", []),
+            "e`f": ("`e``f` BLOB", []),
+            'g"h': ('"g""h" REAL', []),
+            "i)": ("\'i)\' INT", []),
+        }),
+        # nested parentheses and string literals do not split definitions
+        ("CREATE TABLE t (a DECIMAL(10,2) DEFAULT '(,)', b INT CHECK (b IN (1, 2)), c INT)", {
+            "a": ("a DECIMAL(10,2) DEFAULT '(,)'", []),
+            "b": ("b INT CHECK (b IN (1, 2))", []),
+            "c": ("c INT", []),
+        }),
+        ("CREATE TABLE t (A TEXT COLLATE NOCASE, b /* x, y */ INT)", {
+            "a": ("A TEXT COLLATE NOCASE", []),
+            "b": ("b /* x, y */ INT", []),
+        }),
+        # comments following a definition belong to it, before or after its comma
+        ("CREATE TABLE t (a INT, -- first\n b INT -- second, (\n, c INT\n)", {
+            "a": ("a INT", ["first"]),
+            "b": ("b INT", ["second, ("]),
+            "c": ("c INT", []),
+        }),
+        # table constraints follow column definitions and do not replace them
+        ("CREATE TABLE t (primary INT, PRIMARY KEY (primary), CONSTRAINT u UNIQUE (primary), CHECK (primary > 0))", {
+            "primary": ("primary INT", []),
+            "constraint": ("CONSTRAINT u UNIQUE (primary)", []),
+            "check": ("CHECK (primary > 0)", []),
+        }),
+        ("", {}),
+    ]
+
+    def test_definitions(self):
+        for create_sql, columns in self.CASES:
+            self.assertEqual(SQLitePlatform._get_column_definitions(create_sql), columns, create_sql)
+
+    def test_table_columns(self):
+        conn = Connection("sqlite", database=":memory:")
+        conn.execute('CREATE TABLE t ("a,(b" DECIMAL(10,2) -- amount\n, c TEXT COLLATE NOCASE NOT NULL)')
+        columns = list(conn.get_platform().get_table_columns("t"))
+        conn.close()
+        self.assertEqual(columns, [
+            ("a,(b", "decimal", {"precision": 10, "scale": 2, "notnull": False, "comment": "amount"}),
+            ("c", "text", {"platform_options": {"collation": "NOCASE"}}),
+        ])
+
+
+class SQLitePoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.database = os.path.join(self.path, "pool.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _connect(self, database=None):
+        return Connection("sqlite", database=database or self.database, pool_size=2)
+
+    def test_connection_reused(self):
+        conn = self._connect()
+        # temporary tables are private to sqlite3 connection, so they tell whether it was reused
+        conn.execute("CREATE TEMP TABLE tmp (id INTEGER)")
+        conn.close()
+        conn.connect()
+        self.assertEqual(conn.query("SELECT COUNT(*) FROM tmp").fetch_column(), 0)
+        conn.close()
+
+    def test_memory_database_not_pooled(self):
+        conn = self._connect(":memory:")
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.close()
+        conn.connect()
+        self.assertRaises(DBALDriverError, conn.query, "SELECT COUNT(*) FROM t")
+        conn.close()
+
+    def test_release_rolls_back(self):
+        conn = self._connect()
+        conn.execute("CREATE TEMP TABLE tmp (id INTEGER)")
+        conn.begin_transaction()
+        conn.execute("INSERT INTO tmp VALUES (1)")
+        conn.close()
+
+        other = self._connect()
+        self.assertFalse(other.is_transaction_active())
+        self.assertEqual(other.query("SELECT COUNT(*) FROM tmp").fetch_column(), 0)
+        other.execute("INSERT INTO tmp VALUES (2)")
+        self.assertEqual(other.query("SELECT COUNT(*) FROM tmp").fetch_column(), 1)
+        other.close()
+
+    def test_pooled_connection_used_by_other_thread(self):
+        conn = self._connect()
+        conn.execute("CREATE TEMP TABLE tmp (id INTEGER)")
+        conn.close()
+
+        errors = []
+
+        def work():
+            # connection opened by the main thread is acquired from the pool
+            other = self._connect()
+            try:
+                other.execute("INSERT INTO tmp VALUES (1)")
+                other.close()
+            except Exception as ex:
+                errors.append(ex)
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join(5)
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()